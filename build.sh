@@ -1 +1 @@
-python3 src/main.py "/static-site-gen/"
\ No newline at end of file
+python3 src/main.py build "/static-site-gen/"
\ No newline at end of file
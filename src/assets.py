@@ -0,0 +1,108 @@
+import filecmp
+import os
+import shutil
+
+from output import replace_atomically
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+PUBLISH_MODES = ("copy", "hardlink", "reflink")
+
+# ioctl number of FICLONE on Linux, clones file extents on btrfs/xfs/bcachefs
+FICLONE = 0x40049409
+
+class PublishStats:
+    def __init__(self):
+        self.copied = 0
+        self.linked = 0
+        self.skipped = 0
+        self.bytes_written = 0
+
+    def add(self, action, size):
+        if action == "skipped":
+            self.skipped += 1
+        elif action == "linked":
+            self.linked += 1
+        else:
+            self.copied += 1
+            self.bytes_written += size
+
+    def merge(self, other):
+        self.copied += other.copied
+        self.linked += other.linked
+        self.skipped += other.skipped
+        self.bytes_written += other.bytes_written
+
+    def __repr__(self):
+        return (
+            f"PublishStats(copied={self.copied}, linked={self.linked}, "
+            f"skipped={self.skipped}, bytes_written={self.bytes_written})"
+        )
+
+def is_unchanged(from_path, dest_path):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    from_stat = os.stat(from_path)
+    if os.path.samestat(from_stat, dest_stat):
+        return True
+    return from_stat.st_size == dest_stat.st_size and from_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+def reflink(from_path, dest_path):
+    if fcntl is None:
+        raise OSError("reflinks are not supported on this platform")
+    with open(from_path, "rb") as from_file, open(dest_path, "wb") as dest_file:
+        fcntl.ioctl(dest_file.fileno(), FICLONE, from_file.fileno())
+    shutil.copystat(from_path, dest_path)
+
+def same_content(from_path, dest_path):
+    return os.path.isfile(dest_path) and filecmp.cmp(from_path, dest_path, shallow=False)
+
+def publish_file(from_path, dest_path, mode="copy"):
+    if mode == "copy" and not os.path.islink(dest_path) and same_content(from_path, dest_path):
+        # only the mtime moved; syncing it lets the next build skip on size + mtime
+        shutil.copystat(from_path, dest_path)
+        return "skipped"
+    if mode == "hardlink":
+        try:
+            replace_atomically(dest_path, lambda tmp_path: os.link(from_path, tmp_path))
+            return "linked"
+        except OSError:
+            pass
+    elif mode == "reflink":
+        try:
+            replace_atomically(dest_path, lambda tmp_path: reflink(from_path, tmp_path))
+            return "linked"
+        except OSError:
+            pass
+    # copy2 keeps the source mtime so the next build can skip on size + mtime
+    replace_atomically(dest_path, lambda tmp_path: shutil.copy2(from_path, tmp_path))
+    return "copied"
+
+def publish_assets(assets, mode="copy", jobs=4):
+    if mode not in PUBLISH_MODES:
+        raise ValueError(f"unknown asset publish mode: {mode}")
+    stats = PublishStats()
+    pending = []
+    for from_path, dest_path in assets:
+        if is_unchanged(from_path, dest_path):
+            stats.add("skipped", 0)
+        else:
+            pending.append((from_path, dest_path))
+
+    def publish(asset):
+        from_path, dest_path = asset
+        print(f" * {from_path} -> {dest_path}")
+        return publish_file(from_path, dest_path, mode), os.path.getsize(from_path)
+
+    # imported here so the CLI does not pay for concurrent.futures at startup
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        for action, size in executor.map(publish, pending):
+            stats.add(action, size)
+    return stats
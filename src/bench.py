@@ -0,0 +1,127 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from corpus import link_paragraph, reference_page, write_corpus
+from generate_content import generate_pages_recursive
+from markdown_blocks import markdown_to_html_node
+from textnode import text_to_textnodes
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+# seconds render-file may add on top of a bare interpreter start
+STARTUP_BUDGET = 0.05
+
+def best_of(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_quietly(*args):
+    subprocess.run([sys.executable, *args], stdout=subprocess.DEVNULL, check=True)
+
+def run_benchmarks(pages, repeat, jobs):
+    rng = random.Random(0)
+    paragraph = link_paragraph(rng, 5000)
+    reference = reference_page(rng, 10)
+    reference_node = markdown_to_html_node(reference)
+
+    results = {}
+    results["text_to_textnodes"] = best_of(lambda: text_to_textnodes(paragraph), repeat)
+    results["markdown_to_html_node"] = best_of(lambda: markdown_to_html_node(reference), repeat)
+    results["to_html"] = best_of(reference_node.to_html, repeat)
+
+    with tempfile.TemporaryDirectory() as root:
+        content = os.path.join(root, "content")
+        public = os.path.join(root, "public")
+        template = os.path.join(root, "template.html")
+        with open(template, "w") as f:
+            f.write("<html><head><title>{{ Title }}</title></head><body>{{ Content }}</body></html>")
+        written = write_corpus(content, pages)
+
+        results["startup_python"] = best_of(lambda: run_quietly("-c", "pass"), repeat)
+        results["startup_render_file"] = best_of(
+            lambda: run_quietly(MAIN_PATH, "render-file", written[0], "--template", template), repeat
+        )
+
+        # page progress lines would swamp the benchmark output
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, "w")
+        try:
+            results["build"] = best_of(lambda: generate_pages_recursive(content, template, public, "/"), 1)
+            if jobs > 1:
+                results[f"build_jobs{jobs}"] = best_of(
+                    lambda: generate_pages_recursive(content, template, public, "/", jobs=jobs), 1
+                )
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+    return {
+        "revision": git_revision(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "pages": pages + 1,
+        "sizes": {"paragraph": len(paragraph), "reference": len(reference)},
+        "results": results,
+    }
+
+def last_record(output_path):
+    if not os.path.exists(output_path):
+        return None
+    record = None
+    with open(output_path, "r") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+    return record
+
+def print_record(record, previous):
+    print(f"revision {record['revision']}, {record['pages']} pages")
+    for name, seconds in record["results"].items():
+        line = f"  {name:<24} {seconds * 1000:10.1f}ms"
+        if previous is not None and name in previous["results"]:
+            before = previous["results"][name]
+            line += f"  ({(seconds - before) / before * 100:+.1f}% vs {previous['revision']})"
+        print(line)
+    if "startup_render_file" in record["results"]:
+        overhead = record["results"]["startup_render_file"] - record["results"]["startup_python"]
+        status = "within" if overhead <= STARTUP_BUDGET else "OVER"
+        print(f"  render-file startup overhead {overhead * 1000:.1f}ms, {status} the {STARTUP_BUDGET * 1000:.0f}ms budget")
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the generator on a synthetic corpus")
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--output",
+        default="bench_output.txt",
+        help="JSON lines file the results are appended to and compared against",
+    )
+    args = parser.parse_args()
+
+    previous = last_record(args.output)
+    record = run_benchmarks(args.pages, args.repeat, args.jobs)
+    with open(args.output, "a") as f:
+        f.write(json.dumps(record) + "\n")
+    print_record(record, previous)
+
+if __name__ == "__main__":
+    main()
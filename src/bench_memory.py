@@ -0,0 +1,110 @@
+import os
+import sys
+import tempfile
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+import htmlnode
+import markdown_blocks
+import textnode
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from markdown_blocks import markdown_file_to_html_node, markdown_to_html_node
+from textnode import TextNode
+
+# Frozen copies of the node classes from before __slots__ and the shared
+# empty children and props, kept as the baseline: attributes live in a
+# per-instance dict and every node allocates its own [] and {}.
+# Serialization is borrowed from the current classes, so only the memory
+# layout differs.
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+    __eq__ = TextNode.__eq__
+
+class DictHTMLNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children if children is not None else []
+        self.props = props if props is not None else {}
+
+    props_to_html = HTMLNode.props_to_html
+
+class DictLeafNode(DictHTMLNode):
+    def __init__(self, tag, value, props=None):
+        super().__init__(tag, value, None, props)
+
+    to_html = LeafNode.to_html
+    write_html = LeafNode.write_html
+
+class DictParentNode(DictHTMLNode):
+    def __init__(self, tag, children, props=None):
+        super().__init__(tag, None, children, props)
+
+    to_html = ParentNode.to_html
+    write_html = ParentNode.write_html
+
+@contextmanager
+def baseline_nodes():
+    # the renderer looks the classes up as module globals when it calls them
+    patches = [
+        (textnode, "TextNode", DictTextNode),
+        (markdown_blocks, "TextNode", DictTextNode),
+        (markdown_blocks, "ParentNode", DictParentNode),
+        (htmlnode, "LeafNode", DictLeafNode),
+    ]
+    saved = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    for module, name, replacement in patches:
+        setattr(module, name, replacement)
+    try:
+        yield
+    finally:
+        for module, name, original in saved:
+            setattr(module, name, original)
+
+def large_page(sections):
+    blocks = ["# Reference"]
+    for i in range(sections):
+        blocks.append(f"## Section {i}")
+        blocks.append(
+            f"Paragraph {i} with **bold**, _italic_, `code` and a [link](/pages/{i}) "
+            f"next to ![figure {i}](/images/{i}.png) in plain text."
+        )
+        blocks.append("\n".join(f"- item {j} with [a link](/items/{j})" for j in range(10)))
+        blocks.append("```\ncode sample line\nanother line\n```")
+    return "\n\n".join(blocks)
+
+def peak_bytes(render):
+    tracemalloc.start()
+    render()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def read_and_render(path):
+    with open(path, "r") as f:
+        markdown_to_html_node(f.read()).to_html()
+
+def stream_and_render(path):
+    node, _ = markdown_file_to_html_node(path)
+    node.to_html()
+
+def main():
+    sections = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    markdown = large_page(sections)
+    print(f"markdown size: {len(markdown)} bytes, {sections} sections")
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "index.md")
+        with open(path, "w") as f:
+            f.write(markdown)
+        for nodes_name, nodes in [("dict nodes (before)", baseline_nodes), ("slotted nodes", nullcontext)]:
+            for name, render in [("read whole file", read_and_render), ("stream lines", stream_and_render)]:
+                with nodes():
+                    peak = peak_bytes(lambda: render(path))
+                print(f"{nodes_name}, {name}: peak traced memory per page: {peak} bytes ({peak / len(markdown):.1f}x source)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import random
+import re
+import time
+
+from corpus import link_paragraph
+from textnode import TextNode, TextType, split_nodes_delimiter, text_to_textnodes
+
+# Frozen copies of the splitters from before the single-pass scanner, kept
+# as the baseline: each match re-splits the remaining text, so they are
+# quadratic in the number of images and links.
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+def split_nodes_image(old_nodes):
+    new_nodes = []
+    for old_node in old_nodes:
+        if old_node.text_type != TextType.TEXT:
+            new_nodes.append(old_node)
+            continue
+        original_text = old_node.text
+        images = IMAGE_PATTERN.findall(original_text)
+        if len(images) == 0:
+            new_nodes.append(old_node)
+            continue
+        for image in images:
+            sections = original_text.split(f"![{image[0]}]({image[1]})", 1)
+            if len(sections) != 2:
+                raise ValueError("invalid markdown, image section not closed")
+            if sections[0] != "":
+                new_nodes.append(TextNode(sections[0], TextType.TEXT))
+            new_nodes.append(TextNode(image[0], TextType.IMAGE, image[1]))
+            original_text = sections[1]
+        if original_text != "":
+            new_nodes.append(TextNode(original_text, TextType.TEXT))
+    return new_nodes
+
+def split_nodes_link(old_nodes):
+    new_nodes = []
+    for old_node in old_nodes:
+        if old_node.text_type != TextType.TEXT:
+            new_nodes.append(old_node)
+            continue
+        original_text = old_node.text
+        links = LINK_PATTERN.findall(original_text)
+        if len(links) == 0:
+            new_nodes.append(old_node)
+            continue
+        for link in links:
+            sections = original_text.split(f"[{link[0]}]({link[1]})", 1)
+            if len(sections) != 2:
+                raise ValueError("invalid markdown, link section not closed")
+            if sections[0] != "":
+                new_nodes.append(TextNode(sections[0], TextType.TEXT))
+            new_nodes.append(TextNode(link[0], TextType.LINK, link[1]))
+            original_text = sections[1]
+        if original_text != "":
+            new_nodes.append(TextNode(original_text, TextType.TEXT))
+    return new_nodes
+
+def split_pipeline(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+LINKS_ONLY = "See [the docs](https://example.com/docs/{i}) and ![figure {i}](/images/{i}.png) or [page {i}](/pages/{i}). "
+MIXED = (
+    "See [the docs](https://example.com/docs/{i}) and ![figure {i}](/images/{i}.png), "
+    "then **read** the `notes` for [page {i}](/pages/{i}) again. "
+)
+
+def link_dense_paragraph(sentence, size):
+    parts = []
+    length = 0
+    i = 0
+    while length < size:
+        part = sentence.format(i=i)
+        parts.append(part)
+        length += len(part)
+        i += 1
+    return "".join(parts)
+
+def best_of(func, text, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def corpora():
+    for name, sentence in [("links", LINKS_ONLY), ("mixed", MIXED)]:
+        for size in [100_000, 300_000, 600_000, 1_500_000]:
+            yield name, link_dense_paragraph(sentence, size)
+    # the benchmark suite's paragraph: prose between links, with some markup
+    yield "corpus", link_paragraph(random.Random(0), 5000)
+
+def main():
+    print(f"{'corpus':>8} {'size':>10} {'split pipeline':>16} {'single pass':>14} {'speedup':>8}")
+    for name, text in corpora():
+        if text_to_textnodes(text) != split_pipeline(text):
+            raise ValueError("single pass output differs from split pipeline")
+        old = best_of(split_pipeline, text, 5)
+        new = best_of(text_to_textnodes, text, 5)
+        print(f"{name:>8} {len(text):>10} {old:>15.3f}s {new:>13.3f}s {old / new:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
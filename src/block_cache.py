@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from htmlnode import LeafNode, apply_basepath
+from search_index import active_text, collect_text
+
+# bump when block rendering changes so persisted fragments are not reused
+CACHE_VERSION = 2
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+class BlockCache:
+    def __init__(self, basepath="/", max_bytes=DEFAULT_MAX_BYTES, asset_urls=None):
+        self.basepath = basepath
+        self.asset_urls = asset_urls
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        # keys rendered since track_new(), for a pool worker to hand back
+        self.new_keys = None
+
+    @staticmethod
+    def key(block):
+        return hashlib.sha1(block.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, html, text=""):
+        # entries are (html, inline text) so cache hits still feed the search index
+        if key in self.entries:
+            self.size -= entry_size(self.entries.pop(key))
+        entry = (html, text)
+        if entry_size(entry) > self.max_bytes:
+            return
+        self.entries[key] = entry
+        self.size += entry_size(entry)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= entry_size(evicted)
+
+    def render(self, block, block_to_html_node):
+        # fragments are stored with the basepath already applied, so the
+        # returned raw leaf needs no further rewriting
+        key = self.key(block)
+        entry = self.get(key)
+        if entry is None:
+            self.misses += 1
+            with collect_text() as texts:
+                node = apply_basepath(block_to_html_node(block), self.basepath, self.asset_urls)
+            entry = (node.to_html(), " ".join(texts))
+            self.put(key, *entry)
+            if self.new_keys is not None:
+                self.new_keys.append(key)
+        else:
+            self.hits += 1
+        collected = active_text()
+        if collected is not None and entry[1]:
+            collected.append(entry[1])
+        return LeafNode(None, entry[0])
+
+    def track_new(self):
+        self.new_keys = []
+
+    def take_new(self):
+        # (key, html, text) of the blocks rendered since track_new()
+        entries = [(key, *self.entries[key]) for key in self.new_keys if key in self.entries]
+        self.new_keys = None
+        return entries
+
+    def items(self):
+        return [(key, html, text) for key, (html, text) in self.entries.items()]
+
+    def merge(self, entries):
+        for key, html, text in entries:
+            self.put(key, html, text)
+
+    def assets_signature(self):
+        return self.asset_urls.signature if self.asset_urls is not None else None
+
+    def save(self, path):
+        data = {
+            "version": CACHE_VERSION,
+            "basepath": self.basepath,
+            "assets": self.assets_signature(),
+            "entries": list(self.entries.items()),
+        }
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+    def load(self, path):
+        if not os.path.exists(path):
+            return
+        with open(path, "r") as f:
+            try:
+                data = json.load(f)
+            except ValueError:
+                return
+        if data.get("version") != CACHE_VERSION or data.get("basepath") != self.basepath:
+            return
+        if data.get("assets") != self.assets_signature():
+            return
+        self.merge((key, html, text) for key, (html, text) in data.get("entries", []))
+
+def entry_size(entry):
+    return len(entry[0]) + len(entry[1])
+
+_caches = {}
+_max_bytes = DEFAULT_MAX_BYTES
+
+def configure(max_bytes):
+    global _max_bytes
+    _max_bytes = max_bytes
+    _caches.clear()
+
+def shared_cache(basepath, asset_urls=None):
+    # one cache per process, basepath and set of asset URLs; pool workers
+    # each grow their own
+    key = (basepath, asset_urls.signature if asset_urls is not None else None)
+    if key not in _caches:
+        _caches[key] = BlockCache(basepath, _max_bytes, asset_urls)
+    return _caches[key]
+
+def seed_shared_cache(basepath, asset_urls, entries):
+    # pool initializer: workers start from the entries the parent loaded
+    shared_cache(basepath, asset_urls).merge(entries)
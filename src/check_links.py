@@ -0,0 +1,105 @@
+import os
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+
+from generate_content import discover_assets
+from site_index import normalize_url
+
+# set in each worker by the pool initializer so the lookup sets are sent once
+_targets = None
+
+class BrokenReference:
+    __slots__ = ("source", "line", "kind", "url")
+
+    def __init__(self, source, line, kind, url):
+        self.source = source
+        self.line = line
+        self.kind = kind
+        self.url = url
+
+    def __eq__(self, other):
+        return (
+            self.source == other.source
+            and self.line == other.line
+            and self.kind == other.kind
+            and self.url == other.url
+        )
+
+    def __repr__(self):
+        return f"BrokenReference({self.source}, {self.line}, {self.kind}, {self.url})"
+
+    def __str__(self):
+        return f"{self.source}:{self.line}: missing {self.kind} {self.url}"
+
+def asset_urls(dir_path_static):
+    if not os.path.isdir(dir_path_static):
+        return set()
+    return {
+        "/" + os.path.relpath(from_path, dir_path_static).replace(os.sep, "/")
+        for from_path, _ in discover_assets(dir_path_static, "")
+    }
+
+def output_urls(manifest, dir_path_public):
+    # URLs of everything the last build wrote, including listings and site
+    # files that no content page stands behind
+    dests = [entry["dest"] for entry in manifest.pages.values()]
+    dests += [entry["dest"] for entry in manifest.assets.values()]
+    return {
+        "/" + os.path.relpath(dest_path, dir_path_public).replace(os.sep, "/")
+        for dest_path in dests
+    }
+
+def resolve(url, page_url):
+    # Returns the site path a reference points at, or None for references
+    # that are not ours to check (other sites, mailto:, bare fragments).
+    if url.startswith("//") or ":" in url.split("/", 1)[0] or url.startswith("#") or url == "":
+        return None
+    path = url.split("#", 1)[0].split("?", 1)[0]
+    if not path.startswith("/"):
+        path = posixpath.join(page_url, path)
+    trailing = "/" if path.endswith("/") else ""
+    path = posixpath.normpath(path)
+    return path if path == "/" else path + trailing
+
+def check_page(page, page_urls, assets):
+    broken = []
+    for url, line in page.links:
+        path = resolve(url, page.url)
+        if path is None or path in assets or normalize_url(path) in page_urls:
+            continue
+        broken.append(BrokenReference(page.source, line, "link", url))
+    for url, line in page.images:
+        path = resolve(url, page.url)
+        if path is None or path in assets:
+            continue
+        broken.append(BrokenReference(page.source, line, "image", url))
+    return broken
+
+def init_worker(page_urls, assets):
+    global _targets
+    _targets = (page_urls, assets)
+
+def check_pages(pages):
+    page_urls, assets = _targets
+    broken = []
+    for page in pages:
+        broken.extend(check_page(page, page_urls, assets))
+    return broken
+
+def check_links(index, assets, jobs=1, outputs=()):
+    page_urls = set(index.by_url) | {normalize_url(url) for url in outputs}
+    assets = set(assets) | set(outputs)
+    pages = list(index)
+    if jobs == 1 or len(pages) < 2:
+        broken = []
+        for page in pages:
+            broken.extend(check_page(page, page_urls, assets))
+        return broken
+    # one chunk per worker keeps pickling to a handful of round trips
+    chunk_size = -(-len(pages) // jobs)
+    chunks = [pages[i:i + chunk_size] for i in range(0, len(pages), chunk_size)]
+    broken = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(page_urls, assets)) as executor:
+        for chunk_broken in executor.map(check_pages, chunks):
+            broken.extend(chunk_broken)
+    return broken
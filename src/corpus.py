@@ -0,0 +1,87 @@
+import argparse
+import os
+import random
+
+WORDS = (
+    "elf hobbit ring wizard shire river mountain forest tower king road song "
+    "star ship sword light shadow council gate bridge valley"
+).split()
+
+def sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+def link_paragraph(rng, links):
+    parts = []
+    for i in range(links):
+        parts.append(f"{sentence(rng, 6)} [{rng.choice(WORDS)} {i}](/pages/{i}) and")
+        if i % 5 == 0:
+            parts.append(f"![figure {i}](/images/{i}.png)")
+        if i % 7 == 0:
+            parts.append(f"**{rng.choice(WORDS)}** with `code {i}` and _{rng.choice(WORDS)}_")
+    return " ".join(parts) + " end."
+
+def huge_list(rng, items, ordered=False):
+    if ordered:
+        return "\n".join(f"{i}. {sentence(rng, 5)} [item](/items/{i})" for i in range(1, items + 1))
+    return "\n".join(f"- {sentence(rng, 5)} **{rng.choice(WORDS)}**" for _ in range(items))
+
+def code_block(rng, lines):
+    return "```\n" + "\n".join(f"    {sentence(rng, 4)}();" for _ in range(lines)) + "\n```"
+
+def page(rng, title, scale=1):
+    blocks = [f"# {title}", sentence(rng, 30)]
+    for i in range(3 * scale):
+        blocks.append(f"## Section {i}")
+        blocks.append(link_paragraph(rng, 20))
+        blocks.append(huge_list(rng, 10, ordered=i % 2 == 1))
+        blocks.append("> " + sentence(rng, 20) + "\n> " + sentence(rng, 10))
+        blocks.append(code_block(rng, 8))
+    return "\n\n".join(blocks)
+
+def reference_page(rng, sections):
+    blocks = ["# Reference"]
+    for i in range(sections):
+        blocks.append(f"## Section {i}")
+        blocks.append(link_paragraph(rng, 50))
+        blocks.append(huge_list(rng, 200))
+        blocks.append(code_block(rng, 100))
+    return "\n\n".join(blocks)
+
+def write_corpus(root, pages, depth=4, fanout=8, seed=0):
+    # pages are spread over a tree `depth` directories deep with `fanout` children each,
+    # plus one very large reference page
+    rng = random.Random(seed)
+    written = []
+    for i in range(pages):
+        parts = []
+        n = i
+        for _ in range(rng.randint(0, depth)):
+            parts.append(f"d{n % fanout}")
+            n //= fanout
+        parts.append(f"page{i}")
+        dir_path = os.path.join(root, *parts)
+        os.makedirs(dir_path, exist_ok=True)
+        path = os.path.join(dir_path, "index.md")
+        with open(path, "w") as f:
+            f.write(page(rng, f"Page {i}"))
+        written.append(path)
+    reference_dir = os.path.join(root, "reference")
+    os.makedirs(reference_dir, exist_ok=True)
+    path = os.path.join(reference_dir, "index.md")
+    with open(path, "w") as f:
+        f.write(reference_page(rng, 10))
+    written.append(path)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic content tree for benchmarking")
+    parser.add_argument("root")
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    written = write_corpus(args.root, args.pages, args.depth, seed=args.seed)
+    print(f"Wrote {len(written)} pages under {args.root}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import re
+from xml.sax.saxutils import escape
+
+from output import open_atomic
+
+FEED_SIZE = 20
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+EPOCH = "1970-01-01T00:00:00Z"
+
+def absolute_url(site_url, basepath, url):
+    # "https://example.com", "/static-site-gen/", "/blog/tom/"
+    #   -> "https://example.com/static-site-gen/blog/tom/"
+    return site_url.rstrip("/") + basepath.rstrip("/") + url
+
+def quote(value):
+    return escape(value, {'"': "&quot;"})
+
+def page_date(page):
+    # the YYYY-MM-DD prefix of the `date` front matter, or None
+    date = page.metadata.get("date")
+    if not isinstance(date, str):
+        return None
+    match = DATE_PATTERN.match(date.strip())
+    return match.group(0) if match else None
+
+def write_sitemap(path, pages, site_url, basepath, extra_urls=()):
+    # pages are written as they are iterated, so the sitemap is never held in memory
+    with open_atomic(path) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for page in pages:
+            f.write(f"<url><loc>{escape(absolute_url(site_url, basepath, page.url))}</loc>")
+            date = page_date(page)
+            if date is not None:
+                f.write(f"<lastmod>{date}</lastmod>")
+            f.write("</url>\n")
+        for url in extra_urls:
+            f.write(f"<url><loc>{escape(absolute_url(site_url, basepath, url))}</loc></url>\n")
+        f.write("</urlset>\n")
+
+def feed_entries(pages, limit=FEED_SIZE):
+    # dated pages, newest first, then by URL so equal dates keep a stable order
+    dated = [(page_date(page), page) for page in pages]
+    dated = [(date, page) for date, page in dated if date is not None]
+    dated.sort(key=lambda item: item[1].url)
+    dated.sort(key=lambda item: item[0], reverse=True)
+    return dated[:limit]
+
+def write_feed(path, pages, site_url, basepath, title, limit=FEED_SIZE):
+    # An Atom feed of the newest dated pages; `updated` comes from the
+    # newest entry so an unchanged site produces an unchanged feed.
+    entries = feed_entries(pages, limit)
+    updated = f"{entries[0][0]}T00:00:00Z" if entries else EPOCH
+    home = absolute_url(site_url, basepath, "/")
+    with open_atomic(path) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<feed xmlns="http://www.w3.org/2005/Atom">\n')
+        f.write(f"<title>{escape(title)}</title>\n")
+        f.write(f"<id>{escape(home)}</id>\n")
+        f.write(f'<link href="{quote(home)}"/>\n')
+        f.write(f'<link rel="self" href="{quote(absolute_url(site_url, basepath, "/feed.xml"))}"/>\n')
+        f.write(f"<updated>{updated}</updated>\n")
+        for date, page in entries:
+            url = quote(absolute_url(site_url, basepath, page.url))
+            f.write("<entry>")
+            f.write(f"<title>{escape(page.title or page.url)}</title>")
+            f.write(f'<link href="{url}"/><id>{url}</id>')
+            f.write(f"<updated>{date}T00:00:00Z</updated>")
+            author = page.metadata.get("author")
+            if isinstance(author, str) and author:
+                f.write(f"<author><name>{escape(author)}</name></author>")
+            summary = page.metadata.get("description")
+            if isinstance(summary, str) and summary:
+                f.write(f"<summary>{escape(summary)}</summary>")
+            f.write("</entry>\n")
+        f.write("</feed>\n")
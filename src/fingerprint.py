@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+
+from manifest import hash_file
+from output import write_if_changed
+
+HASH_LENGTH = 10
+# files fetched by a fixed name keep it: crawlers, browsers and GitHub Pages
+# ask for these directly, and static HTML pages are linked to by name
+FIXED_NAMES = ("CNAME", ".nojekyll", "robots.txt", "favicon.ico", "humans.txt")
+FIXED_SUFFIXES = (".html", ".htm", ".txt", ".xml")
+
+def fingerprinted_path(path, digest):
+    # images/tolkien.png -> images/tolkien.<hash>.png
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest[:HASH_LENGTH]}{ext}"
+
+def keeps_name(path):
+    name = os.path.basename(path)
+    return name in FIXED_NAMES or name.endswith(FIXED_SUFFIXES)
+
+def asset_url(dest_path, dest_dir_path):
+    return "/" + os.path.relpath(dest_path, dest_dir_path).replace(os.sep, "/")
+
+def split_url(url):
+    # "/a.css?v=1#x" -> ("/a.css", "?v=1#x")
+    end = len(url)
+    for separator in "?#":
+        index = url.find(separator)
+        if index != -1:
+            end = min(end, index)
+    return url[:end], url[end:]
+
+class AssetUrls:
+    # Maps the URL of each static asset to its content-addressed one, and
+    # each image to its size and derivatives. The signature changes whenever
+    # any of it does, so pages, templates and cached blocks that baked in the
+    # old URLs are rendered again.
+    def __init__(self, urls=None, images=None):
+        self.urls = urls if urls is not None else {}
+        self.images = images if images is not None else {}
+        self._signature = None
+
+    def add(self, url, fingerprinted_url):
+        self.urls[url] = fingerprinted_url
+        self._signature = None
+
+    def add_image(self, url, width, height, srcset=()):
+        # srcset holds (url, width) pairs, already fingerprinted
+        self.images[url] = {"width": width, "height": height, "srcset": [list(item) for item in srcset]}
+        self._signature = None
+
+    @property
+    def signature(self):
+        if self._signature is None:
+            data = json.dumps({"urls": self.urls, "images": self.images}, sort_keys=True).encode("utf-8")
+            self._signature = hashlib.sha256(data).hexdigest()
+        return self._signature
+
+    def lookup(self, url):
+        if not url.startswith("/") or url.startswith("//"):
+            return url
+        path, suffix = split_url(url)
+        fingerprinted = self.urls.get(path)
+        return url if fingerprinted is None else fingerprinted + suffix
+
+    def image(self, url):
+        if not url.startswith("/") or url.startswith("//"):
+            return None
+        return self.images.get(split_url(url)[0])
+
+    def write(self, path):
+        return write_if_changed(path, json.dumps(self.urls, indent=1, sort_keys=True) + "\n")
+
+    def __len__(self):
+        return len(self.urls)
+
+def fingerprint_assets(assets, dest_dir_path, asset_urls, manifest=None):
+    # Returns the assets with their fingerprinted destinations and fills in
+    # asset_urls. The manifest's hashes are reused while size and mtime hold.
+    fingerprinted = []
+    for from_path, dest_path in assets:
+        if keeps_name(dest_path):
+            fingerprinted.append((from_path, dest_path))
+            continue
+        digest = manifest.asset_hash(from_path) if manifest is not None else hash_file(from_path)
+        new_dest_path = fingerprinted_path(dest_path, digest)
+        asset_urls.add(asset_url(dest_path, dest_dir_path), asset_url(new_dest_path, dest_dir_path))
+        fingerprinted.append((from_path, new_dest_path))
+    return fingerprinted
@@ -0,0 +1,81 @@
+import itertools
+
+DELIMITER = "---"
+
+def parse_scalar(text):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    lowered = text.lower()
+    if lowered in ("true", "yes"):
+        return True
+    if lowered in ("false", "no"):
+        return False
+    return text
+
+def parse_value(text):
+    text = text.strip()
+    if text.startswith("[") and text.endswith("]"):
+        inner = text[1:-1].strip()
+        return [parse_scalar(item) for item in inner.split(",")] if inner else []
+    return parse_scalar(text)
+
+def parse_front_matter(lines):
+    # The YAML subset pages need: `key: value`, `key: [a, b]`, and `key:`
+    # followed by "- item" lines. Keys are lowercased; values stay strings
+    # apart from true/false and lists. A `key:` with neither a value nor
+    # items is left out, so lookups fall back as if it were never set.
+    metadata = {}
+    key = None
+    for number, line in enumerate(lines, 2):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped == "-" or stripped.startswith("- "):
+            if key is None or not isinstance(metadata.setdefault(key, []), list):
+                raise ValueError(f"front matter line {number}: list item outside a list: {line!r}")
+            metadata[key].append(parse_scalar(stripped[1:]))
+            continue
+        name, separator, value = stripped.partition(":")
+        if not separator or not name.strip():
+            raise ValueError(f"front matter line {number}: expected 'key: value', got {line!r}")
+        key = name.strip().lower()
+        if value.strip():
+            metadata[key] = parse_value(value)
+        else:
+            # a list only once its first "- item" line shows up
+            metadata.pop(key, None)
+    return metadata
+
+def split_front_matter(lines):
+    # Returns the metadata and an iterator over the body lines. Only the header
+    # is consumed, so callers streaming a file stop reading at the closing
+    # delimiter; a header that is never closed is treated as body text.
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, iter(())
+    if first.rstrip() != DELIMITER:
+        return {}, itertools.chain([first], lines)
+    header = []
+    for line in lines:
+        if line.rstrip() == DELIMITER:
+            return parse_front_matter(header), lines
+        header.append(line)
+    return {}, itertools.chain([first], header)
+
+def read_front_matter(path):
+    with open(path, "r") as f:
+        metadata, _ = split_front_matter(line.rstrip("\n") for line in f)
+    return metadata
+
+def template_values(metadata):
+    # front matter keys become {{ key }} placeholders; lists are comma joined
+    values = {}
+    for key, value in metadata.items():
+        if isinstance(value, list):
+            value = ", ".join(str(item) for item in value)
+        elif isinstance(value, bool):
+            value = "true" if value else "false"
+        values[key] = value
+    return values
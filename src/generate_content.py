@@ -1,59 +1,216 @@
+import io
 import os
-import shutil
-from markdown_blocks import markdown_to_html_node
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 
-def copy_files_recursive(source_dir_path, dest_dir_path):
-    if not os.path.exists(dest_dir_path):
-        os.mkdir(dest_dir_path)
+from assets import PublishStats, publish_assets
+from block_cache import seed_shared_cache, shared_cache
+from fingerprint import fingerprint_assets
+from htmlnode import apply_basepath
+from front_matter import template_values
+from markdown_blocks import markdown_file_to_page
+from output import stream_if_changed, write_if_changed
+from pipeline import generate_pages_pipelined
+from postprocess import minify_html
+from search_index import collect_text, page_terms
+from site_index import SiteIndex, discover_pages, extract_title
+from template import load_template
+from timing import PhaseTimer, activate, phase
 
-    for filename in os.listdir(source_dir_path):
+def discover_assets(source_dir_path, dest_dir_path):
+    assets = []
+    for filename in sorted(os.listdir(source_dir_path)):
         from_path = os.path.join(source_dir_path, filename)
         dest_path = os.path.join(dest_dir_path, filename)
-        print(f" * {from_path} -> {dest_path}")
-        if os.path.isfile(from_path):
-            shutil.copy(from_path, dest_path)
-        else:
-            copy_files_recursive(from_path, dest_path)
-
-def extract_title(md):
-    lines = md.split("\n")
-    for line in lines:
-        if line.startswith("# "):
-            return line[2:]
-    raise ValueError("no title found")
-
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
-    for filename in os.listdir(dir_path_content):
-        from_path = os.path.join(dir_path_content, filename)
         if os.path.isfile(from_path):
-            dest_path = os.path.join(dest_dir_path, "index.html")
-            generate_page(from_path, template_path, dest_path, basepath)
+            assets.append((from_path, dest_path))
         else:
-            dest_path = os.path.join(dest_dir_path, filename)
-            generate_pages_recursive(from_path, template_path, dest_path, basepath)
+            assets.extend(discover_assets(from_path, dest_path))
+    return assets
 
-def generate_page(from_path, template_path, dest_path, basepath):
-    print(f" * {from_path} {template_path} -> {dest_path}")
-    from_file = open(from_path, "r")
-    markdown_content = from_file.read()
-    from_file.close()
+def copy_files_recursive(source_dir_path, dest_dir_path, manifest=None, *, mode="copy", jobs=4, asset_urls=None):
+    if not os.path.exists(dest_dir_path):
+        os.mkdir(dest_dir_path)
 
-    template_file = open(template_path, "r")
-    template = template_file.read()
-    template_file.close()
+    assets = discover_assets(source_dir_path, dest_dir_path)
+    if asset_urls is not None:
+        # published under content-addressed names, filling in asset_urls for the pages
+        assets = fingerprint_assets(assets, dest_dir_path, asset_urls, manifest)
+    stats = PublishStats()
+    if manifest is not None:
+        stale_assets = []
+        for from_path, dest_path in assets:
+            entry = manifest.asset_entry(from_path, dest_path)
+            manifest.record_asset(from_path, entry)
+            if manifest.asset_is_current(from_path, entry):
+                stats.add("skipped", 0)
+            else:
+                stale_assets.append((from_path, dest_path))
+        assets = stale_assets
+    stats.merge(publish_assets(assets, mode, jobs))
+    return stats
 
-    node = markdown_to_html_node(markdown_content)
-    html = node.to_html()
+class PageBuildError(Exception):
+    def __init__(self, failures):
+        self.failures = failures
+        lines = [f"{len(failures)} page(s) failed to build:"]
+        for from_path, error in failures:
+            lines.append(f" * {from_path}: {error!r}")
+        super().__init__("\n".join(lines))
 
-    title = extract_title(markdown_content)
-    template = template.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", html)
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath, manifest=None, *, jobs=1, templates_dir=None, report=None, cache_blocks=False, io_threads=0, index=None, index_text=False, on_result=None, asset_urls=None, minify=False):
+    with phase(report and report.timer, "discovery"):
+        if index is None:
+            index = SiteIndex.build(dir_path_content, dest_dir_path, template_path, templates_dir)
+        pages = index.render_list()
+        current = []
+        if manifest is not None:
+            stale_pages = []
+            for from_path, page_template_path, dest_path in pages:
+                entry = manifest.page_entry(
+                    from_path,
+                    page_template_path,
+                    dest_path,
+                    basepath,
+                    index.page(from_path).hash,
+                    asset_urls=asset_urls,
+                    minify=minify,
+                )
+                manifest.record_page(from_path, entry)
+                if manifest.page_is_current(from_path, entry):
+                    current.append((from_path, {"phases": None, "output": "skipped"}))
+                else:
+                    stale_pages.append((from_path, page_template_path, dest_path))
+            pages = stale_pages
+    with phase(report and report.timer, "pages"):
+        results = generate_pages(
+            pages,
+            basepath,
+            jobs=jobs,
+            timed=report is not None,
+            cache_blocks=cache_blocks,
+            io_threads=io_threads,
+            index_text=index_text,
+            on_result=on_result,
+            asset_urls=asset_urls,
+            minify=minify,
+        )
+    if report is not None:
+        for from_path, result in results:
+            report.add_page(from_path, result["phases"])
+    # pages the manifest showed to be current are reported as skipped too
+    return current + results
 
-    template = template.replace('href="/', f'href="{basepath}')
-    template = template.replace('src="/', f'src="{basepath}')
+def generate_pages(pages, basepath, *, jobs=1, timed=False, cache_blocks=False, io_threads=0, index_text=False, on_result=None, asset_urls=None, minify=False):
+    # several sources mapping to one output: the last one in discovery order wins
+    pages = list({page[2]: page for page in pages}.values())
+    results = []
+    failures = []
+
+    def finished(from_path, result):
+        # on_result sees each page as it completes; bulky per-page data such
+        # as search terms is handed over there instead of kept for the caller
+        if on_result is not None:
+            on_result(from_path, result)
+        result.pop("terms", None)
+        blocks = result.pop("blocks", None)
+        if blocks:
+            # blocks a worker rendered join this process's cache, which is the one saved
+            shared_cache(basepath, asset_urls).merge(blocks)
+        results.append((from_path, result))
+
+    options = {
+        "timed": timed, "cache_blocks": cache_blocks, "index_text": index_text, "asset_urls": asset_urls, "minify": minify
+    }
+    if io_threads and jobs == 1 and not timed:
+        pipelined, failures = generate_pages_pipelined(
+            pages,
+            basepath,
+            io_threads=io_threads,
+            cache_blocks=cache_blocks,
+            index_text=index_text,
+            asset_urls=asset_urls,
+            minify=minify,
+        )
+        for from_path, result in pipelined:
+            finished(from_path, result)
+    elif jobs == 1 or len(pages) < 2:
+        for from_path, template_path, dest_path in pages:
+            try:
+                finished(from_path, generate_page(from_path, template_path, dest_path, basepath, **options))
+            except Exception as e:
+                failures.append((from_path, e))
+    else:
+        initializer, initargs = None, ()
+        if cache_blocks:
+            options["return_blocks"] = True
+            entries = shared_cache(basepath, asset_urls).items()
+            if entries:
+                initializer, initargs = seed_shared_cache, (basepath, asset_urls, entries)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=initializer, initargs=initargs) as executor:
+            futures = [
+                (from_path, executor.submit(generate_page, from_path, template_path, dest_path, basepath, **options))
+                for from_path, template_path, dest_path in pages
+            ]
+            for from_path, future in futures:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failures.append((from_path, e))
+                    continue
+                finished(from_path, result)
+    if failures:
+        raise PageBuildError(failures)
+    return results
+
+def generate_page(from_path, template_path, dest_path, basepath, *, timed=False, cache_blocks=False, index_text=False, asset_urls=None, minify=False, return_blocks=False):
+    print(f" * {from_path} {template_path} -> {dest_path}")
+    timer = PhaseTimer() if timed else None
+    block_cache = shared_cache(basepath, asset_urls) if cache_blocks else None
+    hits, misses = (block_cache.hits, block_cache.misses) if block_cache else (0, 0)
+    if block_cache is not None and return_blocks:
+        block_cache.track_new()
+    with activate(timer):
+        with phase(timer, "template_load"):
+            template = load_template(template_path).with_basepath(basepath, asset_urls)
+
+        # the source is parsed as it is read, so reading counts as block parsing
+        with collect_text() if index_text else nullcontext() as texts:
+            node, title, metadata = markdown_file_to_page(from_path, block_cache)
+        with phase(timer, "basepath"):
+            apply_basepath(node, basepath, asset_urls)
+
+        values = {**template_values(metadata), "Title": title, "Content": node}
+        if timer is None and not minify:
+            # streamed into a temporary file that only replaces an unchanged
+            # output when its bytes differ, so the page is never held in memory
+            action = stream_if_changed(dest_path, lambda f: template.render(f, values))
+        elif timer is None:
+            # minifying needs the whole page as one string; it is minified
+            # before the write, so an unchanged page keeps its bytes and mtime
+            page = io.StringIO()
+            template.render(page, values)
+            action = write_if_changed(dest_path, minify_html(page.getvalue()))
+        else:
+            # when timing, serialization, templating and the write are kept apart
+            # instead of streaming through each other into the file
+            with timer.phase("serialize"):
+                content = node.to_html()
+            with timer.phase("template"):
+                page = io.StringIO()
+                template.render(page, {**values, "Content": content})
+            html = page.getvalue()
+            if minify:
+                with timer.phase("minify"):
+                    html = minify_html(html)
+            with timer.phase("write"):
+                action = write_if_changed(dest_path, html)
 
-    dest_dir_path = os.path.dirname(dest_path)
-    if dest_dir_path != "":
-        os.makedirs(dest_dir_path, exist_ok=True)
-    to_file = open(dest_path, "w")
-    to_file.write(template)
\ No newline at end of file
+    result = {"phases": timer.totals if timer else None, "output": action}
+    if index_text:
+        result["terms"] = page_terms(title, " ".join(texts))
+    if block_cache is not None:
+        result["block_cache"] = (block_cache.hits - hits, block_cache.misses - misses)
+        if return_blocks:
+            result["blocks"] = block_cache.take_new()
+    return result
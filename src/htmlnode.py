@@ -1,16 +1,46 @@
+import io
 from enum import Enum
+
 from textnode import TextType, TextNode
 
+def _read_only(self, *args, **kwargs):
+    raise TypeError("shared empty value cannot be modified, assign a new one instead")
+
+class EmptyChildren(list):
+    __slots__ = ()
+    append = extend = insert = remove = pop = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+class EmptyProps(dict):
+    __slots__ = ()
+    __setitem__ = __delitem__ = _read_only
+    update = setdefault = pop = popitem = clear = _read_only
+    __ior__ = _read_only
+
+# shared by every node without children or props instead of a fresh [] / {} each
+EMPTY_CHILDREN = EmptyChildren()
+EMPTY_PROPS = EmptyProps()
+
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
-        self.children = children if children is not None else []
-        self.props = props if props is not None else {}
+        self.children = children if children is not None else EMPTY_CHILDREN
+        self.props = props if props is not None else EMPTY_PROPS
+
+    def set_prop(self, key, value):
+        if self.props is EMPTY_PROPS:
+            self.props = {}
+        self.props[key] = value
 
     def to_html(self):
         raise NotImplementedError()
 
+    def write_html(self, sink):
+        raise NotImplementedError()
+
     def props_to_html(self):
         if not self.props:
             return ""
@@ -20,6 +50,8 @@ class HTMLNode:
         return f"HTMLNode(tag={self.tag}, value={self.value}, children={self.children}, props={self.props})"
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
@@ -31,22 +63,72 @@ class LeafNode(HTMLNode):
 
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def write_html(self, sink):
+        sink.write(self.to_html())
+
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
     def to_html(self):
+        buffer = io.StringIO()
+        self.write_html(buffer)
+        return buffer.getvalue()
+
+    def write_html(self, sink):
         if not self.tag:
             raise ValueError("All parent nodes must have a tag")
         if not self.children:
             raise ValueError("All parent nodes must have children")
 
-        html_string = f"<{self.tag}{self.props_to_html()}>"
+        sink.write(f"<{self.tag}{self.props_to_html()}>")
         for child in self.children:
-            html_string += child.to_html()
-        html_string += f"</{self.tag}>"
+            child.write_html(sink)
+        sink.write(f"</{self.tag}>")
+
+URL_PROPS = ("href", "src")
+
+def rebase_url(url, basepath):
+    if basepath == "/" or not url.startswith("/") or url.startswith("//"):
+        return url
+    return basepath + url[1:]
+
+def rewrite_url(url, basepath, asset_urls=None):
+    if asset_urls is not None:
+        url = asset_urls.lookup(url)
+    return rebase_url(url, basepath)
+
+def apply_basepath(node, basepath, asset_urls=None):
+    # asset_urls, when given, also swaps static asset URLs for their
+    # fingerprinted names in the same walk
+    if basepath == "/" and asset_urls is None:
+        return node
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.props:
+            if current.tag == "img" and asset_urls is not None:
+                add_image_props(current, basepath, asset_urls)
+            for key in URL_PROPS:
+                if key in current.props:
+                    current.props[key] = rewrite_url(current.props[key], basepath, asset_urls)
+        if current.children:
+            stack.extend(current.children)
+    return node
 
-        return html_string
+def add_image_props(node, basepath, asset_urls):
+    # the intrinsic size stops layout shift; srcset lets browsers pick a
+    # derivative no wider than the slot it is shown in
+    image = asset_urls.image(node.props.get("src", ""))
+    if image is None:
+        return
+    node.props["width"] = str(image["width"])
+    node.props["height"] = str(image["height"])
+    if image["srcset"]:
+        node.props["srcset"] = ", ".join(f"{rebase_url(url, basepath)} {width}w" for url, width in image["srcset"])
+        node.props["sizes"] = f"(max-width: {image['width']}px) 100vw, {image['width']}px"
 
 def text_node_to_html_node(text_node):
     match text_node.text_type:
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+from assets import publish_file
+from fingerprint import asset_url, fingerprinted_path
+from manifest import hash_file
+from output import replace_atomically
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# every format image_size reads gets width and height; GIFs, often
+# animated, are not resized
+SIZED_SUFFIXES = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+RESIZABLE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp")
+DEFAULT_WIDTHS = (480, 960)
+JPEG_QUALITY = 82
+# bump when resizing changes so cached derivatives are not reused
+DERIVATIVE_VERSION = 1
+
+class ImageStats:
+    def __init__(self):
+        self.images = 0
+        self.resized = 0
+        self.cached = 0
+        self.missing = 0
+
+    def __repr__(self):
+        return (
+            f"ImageStats(images={self.images}, resized={self.resized}, "
+            f"cached={self.cached}, missing={self.missing})"
+        )
+
+def png_size(data):
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR":
+        return struct.unpack(">II", data[16:24])
+    return None
+
+def jpeg_size(f):
+    # walks the segments up to the first start-of-frame marker
+    if f.read(2) != b"\xff\xd8":
+        return None
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        length = struct.unpack(">H", f.read(2))[0]
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">xHH", f.read(5))
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+def webp_size(data):
+    if data[:4] != b"RIFF" or data[8:12] != b"WEBP":
+        return None
+    chunk = data[12:16]
+    if chunk == b"VP8 " and data[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and data[20:21] == b"\x2f":
+        bits = int.from_bytes(data[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+    return None
+
+def image_size(path):
+    # (width, height) from the file header, so sizing needs no imaging library
+    with open(path, "rb") as f:
+        header = f.read(32)
+        size = png_size(header)
+        if size is not None:
+            return size
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", header[6:10])
+        if header[:4] == b"RIFF":
+            return webp_size(header)
+        if header[:2] == b"\xff\xd8":
+            f.seek(0)
+            try:
+                return jpeg_size(f)
+            except struct.error:
+                return None
+    return None
+
+def derivative_key(content_hash, width):
+    return hashlib.sha256(f"{DERIVATIVE_VERSION}:{content_hash}:{width}:{JPEG_QUALITY}".encode("utf-8")).hexdigest()
+
+def derivative_path(dest_path, width):
+    # images/rivendell.png -> images/rivendell-480w.png
+    root, ext = os.path.splitext(dest_path)
+    return f"{root}-{width}w{ext}"
+
+def resize_image(from_path, cache_path, width):
+    # runs in a pool worker; the cache file appears whole or not at all
+    def create(tmp_path):
+        with Image.open(from_path) as image:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+            resized.save(tmp_path, format=image.format, optimize=True, quality=JPEG_QUALITY)
+
+    replace_atomically(cache_path, create)
+    return cache_path
+
+def plan_derivatives(assets, dest_dir_path, cache_dir, widths, manifest=None):
+    # One entry per image with a readable size: its URL, size and the (width,
+    # cache path, published path) of each derivative narrower than the
+    # original, none for formats that are not resized.
+    # Derivatives are cached under a key of the source hash and the resize
+    # parameters, so an unchanged image is never decoded again.
+    plans = []
+    for from_path, dest_path in assets:
+        if not from_path.lower().endswith(SIZED_SUFFIXES):
+            continue
+        size = image_size(from_path)
+        if size is None:
+            continue
+        derivatives = []
+        if from_path.lower().endswith(RESIZABLE_SUFFIXES):
+            content_hash = manifest.asset_hash(from_path) if manifest is not None else hash_file(from_path)
+            ext = os.path.splitext(from_path)[1].lower()
+            for width in sorted(set(widths)):
+                if width >= size[0]:
+                    continue
+                key = derivative_key(content_hash, width)
+                derivatives.append((width, os.path.join(cache_dir, key + ext), derivative_path(dest_path, width), key))
+        plans.append((from_path, asset_url(dest_path, dest_dir_path), size, derivatives))
+    return plans
+
+def generate_derivatives(assets, dest_dir_path, cache_dir, asset_urls, manifest=None, *, widths=DEFAULT_WIDTHS, jobs=1, mode="copy", fingerprint=False):
+    stats = ImageStats()
+    plans = plan_derivatives(assets, dest_dir_path, cache_dir, widths, manifest)
+    pending = {}
+    for from_path, _, _, derivatives in plans:
+        for width, cache_path, _, _ in derivatives:
+            if os.path.isfile(cache_path):
+                stats.cached += 1
+            elif Image is None:
+                stats.missing += 1
+            elif cache_path not in pending:
+                pending[cache_path] = (from_path, cache_path, width)
+
+    if pending:
+        os.makedirs(cache_dir, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(pending)))) as executor:
+            futures = [executor.submit(resize_image, *job) for job in pending.values()]
+            for future in futures:
+                print(f" * resized {future.result()}")
+                stats.resized += 1
+
+    for from_path, url, (width, height), derivatives in plans:
+        stats.images += 1
+        srcset = []
+        for derivative_width, cache_path, dest_path, key in derivatives:
+            if not os.path.isfile(cache_path):
+                continue
+            if fingerprint:
+                dest_path = fingerprinted_path(dest_path, key)
+            publish_file(cache_path, dest_path, mode)
+            if manifest is not None:
+                manifest.record_output(f"image:{url}@{derivative_width}w", dest_path)
+            srcset.append((asset_url(dest_path, dest_dir_path), derivative_width))
+        if srcset:
+            srcset.append((asset_urls.lookup(url), width))
+        asset_urls.add_image(url, width, height, srcset)
+    return stats
@@ -0,0 +1,138 @@
+import hashlib
+import io
+import json
+import os
+import re
+
+from htmlnode import LeafNode, ParentNode, apply_basepath
+from output import write_if_changed
+from postprocess import minify_html
+from template import load_template, named_template_path
+
+DEFAULT_PAGE_SIZE = 10
+SLUG_PATTERN = re.compile(r"[^a-z0-9]+")
+
+class ListingPage:
+    __slots__ = ("url", "title", "posts", "number", "count", "first_url")
+
+    def __init__(self, url, title, posts, number, count, first_url):
+        self.url = url
+        self.title = title
+        self.posts = posts
+        self.number = number
+        self.count = count
+        self.first_url = first_url
+
+    def page_url(self, number):
+        return self.first_url if number == 1 else f"{self.first_url}page/{number}/"
+
+    def signature(self):
+        # everything the rendered page depends on besides the template
+        data = [self.url, self.title, self.number, self.count]
+        data.extend((post.url, post.title, post.metadata.get("date")) for post in self.posts)
+        return hashlib.sha256(json.dumps(data).encode("utf-8")).hexdigest()
+
+    def __repr__(self):
+        return f"ListingPage({self.url}, {len(self.posts)} posts, {self.number}/{self.count})"
+
+def slugify(text):
+    return SLUG_PATTERN.sub("-", str(text).lower()).strip("-")
+
+def section_posts(index, section):
+    # Posts are the pages below content/<section>/, newest first by their
+    # `date` front matter, then by title. Keys are computed once per post and
+    # Python's sort is stable, so this is two O(n log n) sorts for the section.
+    prefix = f"/{section}/"
+    posts = [page for page in index if page.url.startswith(prefix) and page.url != prefix]
+    posts.sort(key=lambda page: page.title or "")
+    posts.sort(key=lambda page: str(page.metadata.get("date") or ""), reverse=True)
+    return posts
+
+def paginate(first_url, title, posts, page_size):
+    count = max(1, -(-len(posts) // page_size))
+    pages = []
+    for number in range(1, count + 1):
+        url = first_url if number == 1 else f"{first_url}page/{number}/"
+        chunk = posts[(number - 1) * page_size:number * page_size]
+        pages.append(ListingPage(url, title, chunk, number, count, first_url))
+    return pages
+
+def plan_listings(index, sections, page_size=DEFAULT_PAGE_SIZE):
+    # One pass over each section's sorted posts fills every tag's list in
+    # order too, so the whole archive is linear after the section sort.
+    listings = []
+    for section in sections:
+        posts = section_posts(index, section)
+        listings.extend(paginate(f"/{section}/", section.replace("-", " ").title(), posts, page_size))
+        tagged = {}
+        for post in posts:
+            tags = post.metadata.get("tags") or []
+            for tag in tags if isinstance(tags, list) else [tags]:
+                tagged.setdefault(tag, []).append(post)
+        for tag in sorted(tagged, key=str):
+            listings.extend(paginate(f"/{section}/tags/{slugify(tag)}/", f"Posts tagged {tag}", tagged[tag], page_size))
+    return listings
+
+def listing_node(listing):
+    items = []
+    for post in listing.posts:
+        children = [LeafNode("a", post.title or post.url, {"href": post.url})]
+        date = post.metadata.get("date")
+        if date:
+            children.append(LeafNode(None, " "))
+            children.append(LeafNode("time", str(date)))
+        items.append(ParentNode("li", children))
+    children = [LeafNode("h1", listing.title)]
+    if items:
+        children.append(ParentNode("ul", items))
+    links = []
+    if listing.number > 1:
+        links.append(LeafNode("a", "Newer posts", {"href": listing.page_url(listing.number - 1)}))
+    if listing.number < listing.count:
+        links.append(LeafNode("a", "Older posts", {"href": listing.page_url(listing.number + 1)}))
+    if links:
+        children.append(ParentNode("nav", links))
+    return ParentNode("div", children)
+
+def listing_dest_path(dest_dir_path, url):
+    return os.path.join(dest_dir_path, *url.strip("/").split("/"), "index.html")
+
+def listing_template_path(template_path, templates_dir=None):
+    # templates/list.html dresses listings differently from articles when present
+    if templates_dir is not None:
+        path = named_template_path(templates_dir, "list")
+        if os.path.isfile(path):
+            return path
+    return template_path
+
+def render_listing(listing, template_path, basepath, *, asset_urls=None, minify=False):
+    template = load_template(template_path).with_basepath(basepath, asset_urls)
+    node = apply_basepath(listing_node(listing), basepath, asset_urls)
+    page = io.StringIO()
+    template.render(page, {"Title": listing.title, "Content": node})
+    return minify_html(page.getvalue()) if minify else page.getvalue()
+
+def generate_listings(index, sections, template_path, dest_dir_path, basepath, manifest=None, *, page_size=DEFAULT_PAGE_SIZE, templates_dir=None, asset_urls=None, minify=False):
+    # Listing pages are recorded in the manifest under "listing:<url>" with the
+    # hash of their contents, so an incremental build only re-renders the
+    # archive pages a changed post actually appears on (or shifts across).
+    page_template_path = listing_template_path(template_path, templates_dir)
+    results = []
+    for listing in plan_listings(index, sections, page_size):
+        if listing.url in index.by_url:
+            # a hand-written page at the same URL wins
+            continue
+        dest_path = listing_dest_path(dest_dir_path, listing.url)
+        key = f"listing:{listing.url}"
+        if manifest is not None:
+            entry = manifest.page_entry(
+                key, page_template_path, dest_path, basepath, listing.signature(), asset_urls=asset_urls, minify=minify
+            )
+            manifest.record_page(key, entry)
+            if manifest.page_is_current(key, entry):
+                results.append((listing.url, {"output": "skipped"}))
+                continue
+        print(f" * listing {listing.url} -> {dest_path}")
+        action = write_if_changed(dest_path, render_listing(listing, page_template_path, basepath, asset_urls=asset_urls, minify=minify))
+        results.append((listing.url, {"output": action}))
+    return results
@@ -1,30 +1,465 @@
-import sys
+import argparse
 import os
-import shutil
+import sys
 
-from generate_content import copy_files_recursive, generate_pages_recursive
+# Only argparse is imported up front: editor hooks run render-file many
+# times a second, so each command imports just the modules it uses.
 
 dir_path_static = "./static"
 dir_path_public = "./docs"
 dir_path_content = "./content"
 template_path = "./template.html"
+templates_dir = "./templates"
+manifest_path = "./.build-manifest.json"
+metadata_path = "./.site-metadata.json"
+image_cache_dir = "./.image-cache"
+
+COMMANDS = ("build", "render-file", "serve", "check-links")
+
+def add_build_arguments(parser):
+    from assets import PUBLISH_MODES
+
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only rebuild pages and assets whose inputs changed since the last build",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="render pages in N worker processes (0 uses every available core)",
+    )
+    parser.add_argument(
+        "--asset-mode",
+        choices=PUBLISH_MODES,
+        default="copy",
+        help="how changed static assets are published (hardlink/reflink fall back to copy)",
+    )
+    parser.add_argument(
+        "--asset-jobs",
+        type=int,
+        default=4,
+        metavar="N",
+        help="copy static assets with N threads",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="publish static assets as name.<hash>.ext, rewrite references to them and write asset-manifest.json",
+    )
+    parser.add_argument(
+        "--responsive-images",
+        action="store_true",
+        help="add width/height to images and, with Pillow installed, srcset derivatives resized in --jobs processes",
+    )
+    parser.add_argument(
+        "--image-widths",
+        type=parse_widths,
+        default=(480, 960),
+        metavar="W,W,...",
+        help="derivative widths in pixels; images narrower than a width are not upscaled",
+    )
+    parser.add_argument(
+        "--io-threads",
+        type=int,
+        default=0,
+        metavar="N",
+        help="read sources and write pages on background threads (N writers) while rendering; ignored with --jobs or --timings",
+    )
+    parser.add_argument(
+        "--block-cache",
+        action="store_true",
+        help="render identical Markdown blocks once per process and reuse the HTML",
+    )
+    parser.add_argument(
+        "--block-cache-file",
+        metavar="PATH",
+        help="load and save the block cache between builds (implies --block-cache)",
+    )
+    parser.add_argument(
+        "--block-cache-size",
+        type=int,
+        default=64,
+        metavar="MB",
+        help="upper bound on cached HTML per process",
+    )
+    parser.add_argument(
+        "--drafts",
+        action="store_true",
+        help="also build pages whose front matter says draft: true",
+    )
+    add_listing_arguments(parser)
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="collapse insignificant whitespace and comments in generated HTML",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write .gz (and .br when the brotli module is installed) siblings for HTML, CSS, JS, SVG and XML outputs",
+    )
+    parser.add_argument(
+        "--site-url",
+        metavar="URL",
+        help="absolute site URL (e.g. https://example.com); writes sitemap.xml and an Atom feed.xml",
+    )
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help="write search.json, an inverted index of the words on each page",
+    )
+    parser.add_argument(
+        "--timings",
+        metavar="PATH",
+        help="write per-phase and per-page build timings as JSON and print a summary",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="run the build under cProfile and dump the stats (worker processes are not profiled)",
+    )
+
+def parse_widths(text):
+    try:
+        widths = tuple(int(width) for width in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated pixel widths, got {text!r}")
+    if any(width <= 0 for width in widths):
+        raise argparse.ArgumentTypeError(f"widths must be positive, got {text!r}")
+    return widths
+
+def add_listing_arguments(parser):
+    parser.add_argument(
+        "--listing",
+        action="append",
+        default=[],
+        metavar="SECTION",
+        help="generate paginated and per-tag listing pages for content/SECTION (repeatable)",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=10,
+        metavar="N",
+        help="posts per listing page",
+    )
+
+def add_serve_arguments(parser):
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument("--port", type=int, default=8888)
+    add_listing_arguments(parser)
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="rebuild only the affected pages and assets when sources change",
+    )
+    parser.add_argument(
+        "--livereload",
+        action="store_true",
+        help="reload open browser tabs after each watch rebuild",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.2,
+        help="seconds between polls for changed sources",
+    )
+
+def parse_args(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # `main.py [basepath] [options]` from before the subcommands still builds
+    if not argv or argv[0] not in COMMANDS + ("-h", "--help"):
+        argv = ["build"] + argv
+    parser = argparse.ArgumentParser(description="Generate the static site")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_build_arguments(subparsers.add_parser("build", help="build the whole site into docs/"))
+
+    render_parser = subparsers.add_parser("render-file", help="render one Markdown file to HTML")
+    render_parser.add_argument("path")
+    render_parser.add_argument("--template", default=template_path)
+    render_parser.add_argument("--basepath", default="/")
+    render_parser.add_argument(
+        "-o",
+        "--output",
+        metavar="PATH",
+        help="write the page here (only if it changed) instead of to stdout",
+    )
 
-def main():
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
+    add_serve_arguments(subparsers.add_parser("serve", help="build, then serve docs/ locally"))
 
-    print("Deleting public directory...")
-    if os.path.exists(dir_path_public):
-        shutil.rmtree(dir_path_public)
+    check_parser = subparsers.add_parser(
+        "check-links", help="report internal links and images that point at no page or static file"
+    )
+    check_parser.add_argument("--jobs", type=int, default=1, metavar="N")
+    return parser.parse_args(argv)
+
+def build(basepath="/", *, incremental=False, jobs=1, asset_mode="copy", asset_jobs=4, report=None, cache_blocks=False, io_threads=0, minify=False, precompress=False, drafts=False, listings=(), page_size=10, site_url=None, search=False, fingerprint=False, block_cache_file=None, image_widths=None):
+    from block_cache import shared_cache
+    from fingerprint import AssetUrls
+    from generate_content import copy_files_recursive, discover_assets, generate_pages_recursive
+    from images import generate_derivatives
+    from listings import generate_listings
+    from manifest import BuildManifest
+    from metadata import MetadataStore
+    from postprocess import postprocess_outputs
+    from site_index import SiteIndex
+    from timing import phase
+
+    # outputs are only rewritten when their bytes change, so docs/ is kept
+    # between builds and anything this build did not produce is pruned after
+    if incremental:
+        manifest = BuildManifest.load(manifest_path)
+        store = MetadataStore.load(metadata_path)
+    else:
+        manifest = BuildManifest.fresh(manifest_path)
+        store = MetadataStore(metadata_path)
 
     print("Copying static files to public directory...")
-    copy_files_recursive(dir_path_static, dir_path_public)
+    asset_urls = AssetUrls() if fingerprint or image_widths is not None else None
+    with phase(report and report.timer, "static_copy"):
+        stats = copy_files_recursive(
+            dir_path_static,
+            dir_path_public,
+            manifest,
+            mode=asset_mode,
+            jobs=asset_jobs,
+            asset_urls=asset_urls if fingerprint else None,
+        )
+    print(
+        f"Published assets: {stats.copied} copied, {stats.linked} linked, "
+        f"{stats.skipped} unchanged, {stats.bytes_written} bytes written"
+    )
+    if image_widths is not None:
+        print("Generating image derivatives...")
+        with phase(report and report.timer, "images"):
+            stats = generate_derivatives(
+                discover_assets(dir_path_static, dir_path_public),
+                dir_path_public,
+                image_cache_dir,
+                asset_urls,
+                manifest,
+                widths=image_widths,
+                jobs=jobs,
+                mode=asset_mode,
+                fingerprint=fingerprint,
+            )
+        print(f"Images: {stats.images} sized, {stats.resized} resized, {stats.cached} cached")
+        if stats.missing:
+            print(f"Pillow is not installed: {stats.missing} derivatives skipped")
+    if fingerprint:
+        asset_manifest_path = os.path.join(dir_path_public, "asset-manifest.json")
+        asset_urls.write(asset_manifest_path)
+        manifest.record_output("asset-manifest.json", asset_manifest_path)
+        print(f"Fingerprinted {len(asset_urls)} assets")
+    # cached fragments bake in the asset URLs, so the cache is only loaded once they are known
+    if block_cache_file:
+        shared_cache(basepath, asset_urls).load(block_cache_file)
+
+    with phase(report and report.timer, "discovery"):
+        index = SiteIndex.build(
+            dir_path_content, dir_path_public, template_path, templates_dir, store=store, include_drafts=drafts
+        )
+
+    def keep_terms(from_path, result):
+        # terms live in the metadata store, so unchanged pages keep theirs
+        store.entry(from_path)["terms"] = result["terms"]
+
+    if search:
+        for page in index:
+            if "terms" not in store.entry(page.source):
+                # indexed pages are the rendered ones: forget the old entry to render it again
+                manifest.pages.pop(page.source, None)
 
     print("Generating page...")
-    generate_pages_recursive(
+    results = generate_pages_recursive(
         dir_path_content,
         template_path,
         dir_path_public,
-        basepath
+        basepath,
+        manifest,
+        jobs=jobs,
+        templates_dir=templates_dir,
+        report=report,
+        cache_blocks=cache_blocks,
+        io_threads=io_threads,
+        index=index,
+        index_text=search,
+        on_result=keep_terms if search else None,
+        asset_urls=asset_urls,
+        minify=minify,
+    )
+    written = sum(1 for _, result in results if result["output"] == "written")
+    print(f"Pages: {written} written, {len(results) - written} unchanged")
+    if cache_blocks:
+        hits = sum(result.get("block_cache", (0, 0))[0] for _, result in results)
+        misses = sum(result.get("block_cache", (0, 0))[1] for _, result in results)
+        print(f"Block cache: {hits} hits, {misses} misses")
+
+    if listings:
+        print("Generating listings...")
+        with phase(report and report.timer, "listings"):
+            listing_results = generate_listings(
+                index,
+                listings,
+                template_path,
+                dir_path_public,
+                basepath,
+                manifest,
+                page_size=page_size,
+                templates_dir=templates_dir,
+                asset_urls=asset_urls,
+                minify=minify,
+            )
+        written = sum(1 for _, result in listing_results if result["output"] == "written")
+        print(f"Listings: {written} written, {len(listing_results) - written} unchanged")
+
+    if site_url or search:
+        print("Writing site files...")
+        with phase(report and report.timer, "site_files"):
+            write_site_files(
+                index, store, manifest, basepath, site_url=site_url, search=search, listings=listings, page_size=page_size
+            )
+
+    print("Removing stale outputs...")
+    if incremental:
+        manifest.prune(keep_compressed=precompress)
+    else:
+        manifest.prune_untracked(dir_path_public, keep_compressed=precompress)
+
+    if precompress:
+        print("Compressing outputs...")
+        with phase(report and report.timer, "postprocess"):
+            stats = postprocess_outputs(dir_path_public, jobs=asset_jobs)
+        print(f"Compressed outputs: {stats.compressed} compressed, {stats.skipped} unchanged")
+    manifest.save()
+    store.save()
+    if block_cache_file:
+        shared_cache(basepath, asset_urls).save(block_cache_file)
+
+def write_site_files(index, store, manifest, basepath, *, site_url=None, search=False, listings=(), page_size=10):
+    from feeds import write_feed, write_sitemap
+    from listings import plan_listings
+    from output import open_atomic
+    from search_index import SearchIndex
+
+    pages = sorted(index, key=lambda page: page.url)
+    if site_url:
+        listing_urls = sorted(
+            {listing.url for listing in plan_listings(index, listings, page_size)} - set(index.by_url)
+        )
+        sitemap_path = os.path.join(dir_path_public, "sitemap.xml")
+        write_sitemap(sitemap_path, pages, site_url, basepath, listing_urls)
+        manifest.record_output("sitemap.xml", sitemap_path)
+        feed_path = os.path.join(dir_path_public, "feed.xml")
+        home = index.by_url.get("/")
+        write_feed(feed_path, pages, site_url, basepath, home.title if home and home.title else "Feed")
+        manifest.record_output("feed.xml", feed_path)
+    if search:
+        search_index = SearchIndex()
+        for page in pages:
+            search_index.add(page.url, page.title, store.entry(page.source)["terms"])
+        search_path = os.path.join(dir_path_public, "search.json")
+        with open_atomic(search_path) as f:
+            search_index.write(f)
+        manifest.record_output("search.json", search_path)
+
+def check(jobs=1):
+    from check_links import asset_urls, check_links, output_urls
+    from manifest import BuildManifest
+    from metadata import MetadataStore
+    from site_index import SiteIndex
+
+    index = SiteIndex.build(
+        dir_path_content, dir_path_public, template_path, templates_dir, store=MetadataStore.load(metadata_path)
     )
+    # generated listings and site files are only known from the last build
+    outputs = output_urls(BuildManifest.load(manifest_path), dir_path_public)
+    broken = check_links(index, asset_urls(dir_path_static), jobs, outputs)
+    for reference in broken:
+        print(reference)
+    links = sum(len(page.links) + len(page.images) for page in index)
+    print(f"Checked {links} references in {len(index)} pages: {len(broken)} broken")
+    return broken
+
+def render_file(from_path, page_template_path=template_path, basepath="/", output=None):
+    import io
+
+    from front_matter import template_values
+    from htmlnode import apply_basepath
+    from markdown_blocks import markdown_file_to_page
+    from template import load_template
+
+    template = load_template(page_template_path).with_basepath(basepath)
+    node, title, metadata = markdown_file_to_page(from_path)
+    apply_basepath(node, basepath)
+    if output is None:
+        template.render(sys.stdout, {**template_values(metadata), "Title": title, "Content": node})
+        return None
+    from output import write_if_changed
+
+    page = io.StringIO()
+    template.render(page, {**template_values(metadata), "Title": title, "Content": node})
+    return write_if_changed(output, page.getvalue())
+
+def run_build(args):
+    import block_cache
+    from timing import BuildReport
+
+    report = BuildReport() if args.timings else None
+    cache_blocks = args.block_cache or args.block_cache_file is not None
+    if cache_blocks:
+        block_cache.configure(args.block_cache_size * 1024 * 1024)
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    build(
+        args.basepath,
+        incremental=args.incremental,
+        jobs=args.jobs or os.cpu_count() or 1,
+        asset_mode=args.asset_mode,
+        asset_jobs=args.asset_jobs,
+        report=report,
+        cache_blocks=cache_blocks,
+        io_threads=args.io_threads,
+        minify=args.minify,
+        precompress=args.precompress,
+        drafts=args.drafts,
+        listings=args.listing,
+        page_size=args.page_size,
+        site_url=args.site_url,
+        search=args.search_index,
+        fingerprint=args.fingerprint,
+        block_cache_file=args.block_cache_file,
+        image_widths=args.image_widths if args.responsive_images else None,
+    )
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        print(f"Wrote profile to {args.profile}")
+    if report is not None:
+        report.write_json(args.timings)
+        print(report.summary())
+        print(f"Wrote timings to {args.timings}")
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "render-file":
+        render_file(args.path, args.template, args.basepath, args.output)
+    elif args.command == "serve":
+        import serve
+
+        serve.run(args)
+    elif args.command == "check-links":
+        sys.exit(1 if check(args.jobs or os.cpu_count() or 1) else 0)
+    else:
+        run_build(args)
 
-main()
+if __name__ == "__main__":
+    main()
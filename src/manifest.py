@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+
+from output import COMPRESSED_SUFFIXES
+
+MANIFEST_VERSION = 1
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class BuildManifest:
+    def __init__(self, path, pages=None, assets=None, known_assets=None):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+        self.assets = assets if assets is not None else {}
+        # asset entries whose hashes may be reused while size and mtime match
+        self.known_assets = known_assets if known_assets is not None else self.assets
+        self.new_pages = {}
+        self.new_assets = {}
+        self.template_hashes = {}
+        self.asset_hashes = {}
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls(path)
+        with open(path, "r") as f:
+            try:
+                data = json.load(f)
+            except ValueError:
+                return cls(path)
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get("pages", {}), data.get("assets", {}))
+
+    @classmethod
+    def fresh(cls, path):
+        # Nothing is current, so every page and asset is published again, but
+        # the previous build's asset hashes still spare re-reading large files.
+        return cls(path, known_assets=cls.load(path).assets)
+
+    def save(self):
+        data = {
+            "version": MANIFEST_VERSION,
+            "pages": self.new_pages,
+            "assets": self.new_assets,
+        }
+        with open(self.path, "w") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+
+    def template_hash(self, template_path):
+        if template_path not in self.template_hashes:
+            self.template_hashes[template_path] = hash_file(template_path)
+        return self.template_hashes[template_path]
+
+    def page_entry(self, from_path, template_path, dest_path, basepath, content_hash=None, asset_urls=None, minify=False):
+        entry = {
+            "hash": content_hash or hash_file(from_path),
+            "template": template_path,
+            "template_hash": self.template_hash(template_path),
+            "basepath": basepath,
+            "dest": dest_path,
+        }
+        if asset_urls is not None:
+            # pages bake in fingerprinted asset URLs, so any asset change re-renders them
+            entry["assets"] = asset_urls.signature
+        if minify:
+            entry["minify"] = True
+        return entry
+
+    def asset_stat(self, from_path):
+        # (hash, size, mtime), computed once per build; large assets are only
+        # re-hashed when size or mtime moved since the previous build
+        if from_path not in self.asset_hashes:
+            stat = os.stat(from_path)
+            previous = self.known_assets.get(from_path)
+            if previous is not None and previous.get("size") == stat.st_size and previous.get("mtime") == stat.st_mtime_ns:
+                content_hash = previous["hash"]
+            else:
+                content_hash = hash_file(from_path)
+            self.asset_hashes[from_path] = (content_hash, stat.st_size, stat.st_mtime_ns)
+        return self.asset_hashes[from_path]
+
+    def asset_hash(self, from_path):
+        return self.asset_stat(from_path)[0]
+
+    def asset_entry(self, from_path, dest_path):
+        content_hash, size, mtime = self.asset_stat(from_path)
+        return {
+            "hash": content_hash,
+            "dest": dest_path,
+            "size": size,
+            "mtime": mtime,
+        }
+
+    def page_is_current(self, from_path, entry):
+        return self.pages.get(from_path) == entry and os.path.exists(entry["dest"])
+
+    def asset_is_current(self, from_path, entry):
+        previous = self.assets.get(from_path)
+        if previous is None or not os.path.exists(entry["dest"]):
+            return False
+        return previous["hash"] == entry["hash"] and previous["dest"] == entry["dest"]
+
+    def record_page(self, from_path, entry):
+        self.new_pages[from_path] = entry
+
+    def record_asset(self, from_path, entry):
+        self.new_assets[from_path] = entry
+
+    def record_output(self, key, dest_path):
+        # a file produced outside the page and asset passes (sitemap, feed,
+        # search index, image derivatives) that pruning must keep
+        self.new_pages[f"output:{key}"] = {"dest": dest_path}
+
+    def stale_outputs(self):
+        old_dests = {entry["dest"] for entry in self.pages.values()}
+        old_dests |= {entry["dest"] for entry in self.assets.values()}
+        new_dests = {entry["dest"] for entry in self.new_pages.values()}
+        new_dests |= {entry["dest"] for entry in self.new_assets.values()}
+        return sorted(old_dests - new_dests)
+
+    def outputs(self):
+        outputs = {entry["dest"] for entry in self.new_pages.values()}
+        outputs |= {entry["dest"] for entry in self.new_assets.values()}
+        return {os.path.normpath(dest_path) for dest_path in outputs}
+
+    def prune(self, keep_compressed=False):
+        # Precompressed siblings are only kept when this build compresses
+        # again, which refreshes any whose output was rewritten.
+        removed = []
+        for dest_path in self.stale_outputs():
+            if os.path.isfile(dest_path):
+                print(f" * removing stale {dest_path}")
+                os.remove(dest_path)
+                removed.append(dest_path)
+            removed.extend(remove_compressed(dest_path))
+            remove_empty_dirs(os.path.dirname(dest_path))
+        if not keep_compressed:
+            for dest_path in sorted(self.outputs()):
+                removed.extend(remove_compressed(dest_path))
+        return removed
+
+    def prune_untracked(self, root, keep_compressed=False):
+        # Without a previous manifest, anything under root this build did not
+        # produce is stale; precompressed siblings follow their output while
+        # this build compresses again.
+        outputs = self.outputs()
+        removed = []
+        for dir_path, _, filenames in os.walk(root, topdown=False):
+            for filename in sorted(filenames):
+                path = os.path.normpath(os.path.join(dir_path, filename))
+                base, suffix = os.path.splitext(path)
+                if path in outputs or (keep_compressed and suffix in COMPRESSED_SUFFIXES and base in outputs):
+                    continue
+                print(f" * removing stale {path}")
+                os.remove(path)
+                removed.append(path)
+            if dir_path != root and not os.listdir(dir_path):
+                os.rmdir(dir_path)
+        return removed
+
+def remove_compressed(dest_path):
+    removed = []
+    for suffix in COMPRESSED_SUFFIXES:
+        if os.path.isfile(dest_path + suffix):
+            print(f" * removing stale {dest_path + suffix}")
+            os.remove(dest_path + suffix)
+            removed.append(dest_path + suffix)
+    return removed
+
+def remove_empty_dirs(dir_path):
+    while dir_path and os.path.isdir(dir_path) and not os.listdir(dir_path):
+        os.rmdir(dir_path)
+        dir_path = os.path.dirname(dir_path)
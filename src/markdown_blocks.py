@@ -1,7 +1,10 @@
 from enum import Enum
 
+from front_matter import split_front_matter
 from htmlnode import ParentNode, text_node_to_html_node
+from search_index import active_text
 from textnode import TextNode, TextType, text_to_textnodes
+from timing import timed
 
 
 class BlockType(Enum):
@@ -12,34 +15,77 @@ class BlockType(Enum):
     OLIST = "ordered_list"
     ULIST = "unordered_list"
 
-def markdown_to_blocks(markdown):
-    blocks = markdown.split("\n\n")
-    filtered_blocks = []
-    for block in blocks:
-        if block == "":
+def file_lines(f):
+    # yields the same items as f.read().split("\n") without reading it all
+    line = ""
+    for line in f:
+        yield line[:-1] if line.endswith("\n") else line
+    if line == "" or line.endswith("\n"):
+        yield ""
+
+def iter_block_lines(lines):
+    # Groups the items of markdown.split("\n") into blocks separated by empty
+    # lines, stripped and filtered exactly like markdown_to_blocks.
+    block_lines = []
+    seen_text = False
+    empty_run = 0
+    for line in lines:
+        if line == "":
+            empty_run += 1
+            if block_lines:
+                yield strip_block_lines(block_lines)
+                block_lines = []
             continue
-        block = block.strip()
-        filtered_blocks.append(block)
-    return filtered_blocks
+        seen_text = True
+        empty_run = 0
+        block_lines.append(line)
+    if block_lines:
+        yield strip_block_lines(block_lines)
+    # splitting on "\n\n" leaves a lone "\n" after an odd run of trailing
+    # newlines, which strips to an empty block that is kept
+    trailing_newlines = empty_run if seen_text else empty_run - 1
+    if trailing_newlines % 2 == 1 and (trailing_newlines >= 3 or not seen_text):
+        yield [""]
+
+def strip_block_lines(lines):
+    start = 0
+    while start < len(lines) - 1 and lines[start].strip() == "":
+        start += 1
+    end = len(lines)
+    while end - 1 > start and lines[end - 1].strip() == "":
+        end -= 1
+    lines = lines[start:end]
+    if len(lines) == 1:
+        return [lines[0].strip()]
+    lines[0] = lines[0].lstrip()
+    lines[-1] = lines[-1].rstrip()
+    return lines
+
+@timed("block_parse")
+def markdown_to_blocks(markdown):
+    return ["\n".join(lines) for lines in iter_block_lines(markdown.split("\n"))]
 
 def block_to_block_type(block):
-    lines = block.split("\n")
+    return block_lines_to_block_type(block.split("\n"))
 
-    if block.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
+@timed("block_parse")
+def block_lines_to_block_type(lines):
+    first = lines[0]
+    if first.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
         return BlockType.HEADING
-    if len(lines) > 1 and lines[0].startswith("```") and lines[-1].startswith("```"):
+    if len(lines) > 1 and first.startswith("```") and lines[-1].startswith("```"):
         return BlockType.CODE
-    if block.startswith(">"):
+    if first.startswith(">"):
         for line in lines:
             if not line.startswith(">"):
                 return BlockType.PARAGRAPH
         return BlockType.QUOTE
-    if block.startswith("- "):
+    if first.startswith("- "):
         for line in lines:
             if not line.startswith("- "):
                 return BlockType.PARAGRAPH
         return BlockType.ULIST
-    if block.startswith("1. "):
+    if first.startswith("1. "):
         i = 1
         for line in lines:
             if not line.startswith(f"{i}. "):
@@ -48,47 +94,91 @@ def block_to_block_type(block):
         return BlockType.OLIST
     return BlockType.PARAGRAPH
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
+def markdown_to_html_node(markdown, block_cache=None):
+    return lines_to_html_node(markdown.split("\n"), block_cache)
+
+def markdown_file_to_html_node(from_path, block_cache=None):
+    node, title, _ = markdown_file_to_page(from_path, block_cache)
+    return node, title
+
+def markdown_lines_to_html_node(lines, block_cache=None):
+    node, title, _ = markdown_lines_to_page(lines, block_cache)
+    return node, title
+
+def markdown_file_to_page(from_path, block_cache=None):
+    with open(from_path, "r") as f:
+        return markdown_lines_to_page(file_lines(f), block_cache)
+
+def markdown_lines_to_page(lines, block_cache=None):
+    # Returns the node, the title and the front matter. The title is the
+    # front matter's, else the first "# " line seen, which is what
+    # extract_title would find, without a second pass over the lines.
+    metadata, lines = split_front_matter(lines)
+    title_lines = []
+
+    def track_title(lines):
+        for line in lines:
+            if not title_lines and line.startswith("# "):
+                title_lines.append(line)
+            yield line
+
+    node = lines_to_html_node(track_title(lines), block_cache)
+    if "title" in metadata:
+        return node, str(metadata["title"]), metadata
+    if not title_lines:
+        raise ValueError("no title found")
+    return node, title_lines[0][2:], metadata
+
+@timed("block_parse")
+def lines_to_html_node(lines, block_cache=None):
     children = []
-    for block in blocks:
-        html_node = block_to_html_node(block)
+    for block_lines in iter_block_lines(lines):
+        if block_cache is not None:
+            html_node = block_cache.render("\n".join(block_lines), block_to_html_node)
+        else:
+            html_node = block_lines_to_html_node(block_lines)
         children.append(html_node)
     return ParentNode("div", children, None)
 
 
 def block_to_html_node(block):
-    block_type = block_to_block_type(block)
+    return block_lines_to_html_node(block.split("\n"))
+
+def block_lines_to_html_node(lines):
+    block_type = block_lines_to_block_type(lines)
     if block_type == BlockType.PARAGRAPH:
-        return paragraph_to_html_node(block)
+        return paragraph_to_html_node(lines)
     if block_type == BlockType.HEADING:
-        return heading_to_html_node(block)
+        return heading_to_html_node(lines)
     if block_type == BlockType.CODE:
-        return code_to_html_node(block)
+        return code_to_html_node(lines)
     if block_type == BlockType.OLIST:
-        return olist_to_html_node(block)
+        return olist_to_html_node(lines)
     if block_type == BlockType.ULIST:
-        return ulist_to_html_node(block)
+        return ulist_to_html_node(lines)
     if block_type == BlockType.QUOTE:
-        return quote_to_html_node(block)
+        return quote_to_html_node(lines)
     raise ValueError("invalid block type")
 
 def text_to_children(text):
     text_nodes = text_to_textnodes(text)
+    collected = active_text()
+    if collected is not None:
+        collected.extend(text_node.text for text_node in text_nodes)
     children = []
     for text_node in text_nodes:
         html_node = text_node_to_html_node(text_node)
         children.append(html_node)
     return children
 
-def paragraph_to_html_node(block):
-    lines = block.split("\n")
+def paragraph_to_html_node(lines):
     paragraph = " ".join(lines)
     children = text_to_children(paragraph)
     return ParentNode("p", children)
 
 
-def heading_to_html_node(block):
+def heading_to_html_node(lines):
+    block = "\n".join(lines)
     level = 0
     for char in block:
         if char == "#":
@@ -102,7 +192,8 @@ def heading_to_html_node(block):
     return ParentNode(f"h{level}", children)
 
 
-def code_to_html_node(block):
+def code_to_html_node(lines):
+    block = "\n".join(lines)
     if not block.startswith("```") or not block.endswith("```"):
         raise ValueError("invalid code block")
     text = block[4:-3]
@@ -112,28 +203,25 @@ def code_to_html_node(block):
     return ParentNode("pre", [code])
 
 
-def olist_to_html_node(block):
-    items = block.split("\n")
+def olist_to_html_node(lines):
     html_items = []
-    for item in items:
+    for item in lines:
         text = item[3:]
         children = text_to_children(text)
         html_items.append(ParentNode("li", children))
     return ParentNode("ol", html_items)
 
 
-def ulist_to_html_node(block):
-    items = block.split("\n")
+def ulist_to_html_node(lines):
     html_items = []
-    for item in items:
+    for item in lines:
         text = item[2:]
         children = text_to_children(text)
         html_items.append(ParentNode("li", children))
     return ParentNode("ul", html_items)
 
 
-def quote_to_html_node(block):
-    lines = block.split("\n")
+def quote_to_html_node(lines):
     new_lines = []
     for line in lines:
         if not line.startswith(">"):
@@ -141,4 +229,4 @@ def quote_to_html_node(block):
         new_lines.append(line.lstrip(">").strip())
     content = " ".join(new_lines)
     children = text_to_children(content)
-    return ParentNode("blockquote", children)
\ No newline at end of file
+    return ParentNode("blockquote", children)
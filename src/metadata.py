@@ -0,0 +1,47 @@
+import json
+import os
+
+STORE_VERSION = 1
+
+class MetadataStore:
+    # What discovery learned about each page (hash, title, front matter,
+    # references), kept between builds and reused while the source's size
+    # and mtime are unchanged, so unchanged pages are not read at all.
+    def __init__(self, path=None, entries=None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self.new_entries = {}
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls(path)
+        with open(path, "r") as f:
+            try:
+                data = json.load(f)
+            except ValueError:
+                return cls(path)
+        if data.get("version") != STORE_VERSION:
+            return cls(path)
+        return cls(path, data.get("pages", {}))
+
+    def save(self):
+        data = {"version": STORE_VERSION, "pages": self.new_entries}
+        with open(self.path, "w") as f:
+            json.dump(data, f, sort_keys=True)
+
+    def lookup(self, from_path):
+        entry = self.entries.get(from_path)
+        if entry is None:
+            return None
+        stat = os.stat(from_path)
+        if entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime_ns:
+            return None
+        return entry
+
+    def record(self, from_path, entry):
+        self.new_entries[from_path] = entry
+
+    def entry(self, from_path):
+        # the entry recorded by this build, for later phases to add to
+        return self.new_entries.get(from_path)
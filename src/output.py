@@ -0,0 +1,86 @@
+import filecmp
+import os
+import threading
+from contextlib import contextmanager
+
+# precompressed siblings written next to an output, which follow it when it is pruned
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+def file_matches(path, data):
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except (FileNotFoundError, IsADirectoryError):
+        return False
+
+def temp_path(path):
+    # unique per process and thread so concurrent writers never share one
+    return f"{path}.tmp{os.getpid()}-{threading.get_ident()}"
+
+def replace_atomically(path, create, *, if_changed=False):
+    # Calls create(tmp_path) and renames the result over path, so readers
+    # (and a deploy sync running mid-build) see the old or the new file,
+    # never a partial one. With if_changed, an identical result is dropped
+    # and the target keeps its mtime.
+    dir_path = os.path.dirname(path)
+    if dir_path != "":
+        os.makedirs(dir_path, exist_ok=True)
+    tmp_path = temp_path(path)
+    try:
+        create(tmp_path)
+        if if_changed and os.path.isfile(path) and filecmp.cmp(tmp_path, path, shallow=False):
+            os.remove(tmp_path)
+            return "skipped"
+        os.replace(tmp_path, path)
+        return "written"
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def atomic_write(path, data):
+    def create(tmp_path):
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+
+    replace_atomically(path, create)
+
+def write_if_changed(path, data):
+    # identical outputs keep their mtime, so rsync and CDNs see no change
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if file_matches(path, data):
+        return "skipped"
+    atomic_write(path, data)
+    return "written"
+
+def stream_if_changed(path, render):
+    # write_if_changed for text render(f) streams out: it goes straight into
+    # the temporary file, never held as one string or its encoded bytes
+    def create(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            render(f)
+
+    return replace_atomically(path, create, if_changed=True)
+
+@contextmanager
+def open_atomic(path):
+    # Streams text into a temporary file; the target is only replaced when
+    # the finished file differs from it, like write_if_changed.
+    dir_path = os.path.dirname(path)
+    if dir_path != "":
+        os.makedirs(dir_path, exist_ok=True)
+    tmp_path = temp_path(path)
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            yield f
+        if os.path.isfile(path) and filecmp.cmp(tmp_path, path, shallow=False):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,115 @@
+import io
+import queue
+import threading
+from contextlib import nullcontext
+
+from block_cache import shared_cache
+from front_matter import template_values
+from htmlnode import apply_basepath
+from markdown_blocks import markdown_lines_to_page
+from output import write_if_changed
+from postprocess import minify_html
+from search_index import collect_text, page_terms
+from template import load_template
+
+# marks the end of a stage's output
+DONE = object()
+
+def read_sources(pages, read_queue, stop):
+    for page in pages:
+        if stop.is_set():
+            break
+        from_path = page[0]
+        try:
+            with open(from_path, "r") as f:
+                read_queue.put((page, f.read(), None))
+        except Exception as e:
+            read_queue.put((page, None, e))
+    read_queue.put(DONE)
+
+def write_outputs(write_queue, failures, lock):
+    while True:
+        item = write_queue.get()
+        if item is DONE:
+            return
+        from_path, dest_path, html, result = item
+        try:
+            result["output"] = write_if_changed(dest_path, html)
+        except Exception as e:
+            with lock:
+                failures.append((from_path, e))
+
+def render_source(markdown, template_path, basepath, *, block_cache=None, index_text=False, asset_urls=None, minify=False):
+    # returns the page and, when index_text is set, its search terms
+    template = load_template(template_path).with_basepath(basepath, asset_urls)
+    with collect_text() if index_text else nullcontext() as texts:
+        node, title, metadata = markdown_lines_to_page(markdown.split("\n"), block_cache)
+    apply_basepath(node, basepath, asset_urls)
+    page = io.StringIO()
+    template.render(page, {**template_values(metadata), "Title": title, "Content": node})
+    html = minify_html(page.getvalue()) if minify else page.getvalue()
+    return html, page_terms(title, " ".join(texts)) if index_text else None
+
+def generate_pages_pipelined(pages, basepath, *, io_threads=4, queue_size=16, cache_blocks=False, index_text=False, asset_urls=None, minify=False):
+    # Reads run ahead of rendering and writes trail behind it on their own
+    # threads; the bounded queues stop either side from piling up pages in
+    # memory when the other is slower.
+    read_queue = queue.Queue(maxsize=queue_size)
+    write_queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    lock = threading.Lock()
+    failures = []
+    results = []
+    block_cache = shared_cache(basepath, asset_urls) if cache_blocks else None
+
+    reader = threading.Thread(target=read_sources, args=(pages, read_queue, stop), daemon=True)
+    writers = [
+        threading.Thread(target=write_outputs, args=(write_queue, failures, lock), daemon=True)
+        for _ in range(max(1, io_threads))
+    ]
+    reader.start()
+    for writer in writers:
+        writer.start()
+
+    try:
+        while True:
+            item = read_queue.get()
+            if item is DONE:
+                break
+            (from_path, template_path, dest_path), markdown, error = item
+            print(f" * {from_path} {template_path} -> {dest_path}")
+            if error is None:
+                hits, misses = (block_cache.hits, block_cache.misses) if block_cache else (0, 0)
+                try:
+                    html, terms = render_source(
+                        markdown, template_path, basepath, block_cache=block_cache, index_text=index_text, asset_urls=asset_urls, minify=minify
+                    )
+                except Exception as e:
+                    error = e
+            if error is not None:
+                with lock:
+                    failures.append((from_path, error))
+                continue
+            result = {"phases": None}
+            if index_text:
+                result["terms"] = terms
+            if block_cache is not None:
+                result["block_cache"] = (block_cache.hits - hits, block_cache.misses - misses)
+            results.append((from_path, result))
+            write_queue.put((from_path, dest_path, html, result))
+    finally:
+        stop.set()
+        # drain so a reader blocked on a full queue can finish
+        while reader.is_alive():
+            try:
+                read_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        for _ in writers:
+            write_queue.put(DONE)
+        for writer in writers:
+            writer.join()
+
+    failed = {from_path for from_path, _ in failures}
+    results = [result for result in results if result[0] not in failed]
+    return results, failures
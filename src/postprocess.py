@@ -0,0 +1,112 @@
+import gzip
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from output import atomic_write
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_SUFFIXES = (".html", ".css", ".js", ".svg", ".xml")
+
+# whitespace is significant inside these, so they are copied through untouched
+PRESERVED_PATTERN = re.compile(r"<(pre|textarea|script|style)\b.*?</\1\s*>", re.S | re.I)
+TAG_PATTERN = re.compile(r"(?P<comment><!--(?!\[if).*?-->)|<[^>]*>", re.S)
+# the ASCII whitespace HTML collapses; \s would also take U+00A0 and other
+# Unicode spaces that render as written
+WHITESPACE_PATTERN = re.compile(r"[ \t\n\r\f]+")
+
+class PostprocessStats:
+    def __init__(self):
+        self.compressed = 0
+        self.skipped = 0
+
+    def merge(self, other):
+        self.compressed += other.compressed
+        self.skipped += other.skipped
+
+    def __repr__(self):
+        return f"PostprocessStats(compressed={self.compressed}, skipped={self.skipped})"
+
+def compression_formats():
+    return ("gz", "br") if brotli is not None else ("gz",)
+
+def minify_text(text):
+    # whitespace runs render as a single space outside preformatted elements
+    out = []
+    pos = 0
+    for match in TAG_PATTERN.finditer(text):
+        out.append(WHITESPACE_PATTERN.sub(" ", text[pos:match.start()]))
+        if match.group("comment") is None:
+            out.append(match.group())
+        pos = match.end()
+    out.append(WHITESPACE_PATTERN.sub(" ", text[pos:]))
+    return "".join(out)
+
+def minify_html(html):
+    out = []
+    pos = 0
+    for match in PRESERVED_PATTERN.finditer(html):
+        out.append(minify_text(html[pos:match.start()]))
+        out.append(match.group())
+        pos = match.end()
+    out.append(minify_text(html[pos:]))
+    return "".join(out).strip()
+
+def compress(data, fmt):
+    if fmt == "gz":
+        # mtime=0 keeps the output byte-identical across builds
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if fmt == "br":
+        return brotli.compress(data, quality=11)
+    raise ValueError(f"unknown compression format: {fmt}")
+
+def siblings_are_current(path, formats):
+    # siblings carry the mtime of the output they were compressed from, so
+    # any rewrite, even one copying in an older file, shows up as a mismatch
+    mtime = os.stat(path).st_mtime_ns
+    for fmt in formats:
+        try:
+            if os.stat(f"{path}.{fmt}").st_mtime_ns != mtime:
+                return False
+        except FileNotFoundError:
+            return False
+    return True
+
+def postprocess_file(path, formats):
+    # Pages are minified as they are rendered; this pass only compresses,
+    # so an output whose siblings match its mtime is left alone.
+    stats = PostprocessStats()
+    if siblings_are_current(path, formats):
+        stats.skipped += 1
+        return stats
+    with open(path, "rb") as f:
+        mtime = os.fstat(f.fileno()).st_mtime_ns
+        data = f.read()
+    for fmt in formats:
+        atomic_write(f"{path}.{fmt}", compress(data, fmt))
+        os.utime(f"{path}.{fmt}", ns=(mtime, mtime))
+    stats.compressed += 1
+    return stats
+
+def discover_outputs(dest_dir_path):
+    outputs = []
+    for root, dirs, files in os.walk(dest_dir_path):
+        dirs.sort()
+        for filename in sorted(files):
+            if filename.endswith(COMPRESSIBLE_SUFFIXES):
+                outputs.append(os.path.join(root, filename))
+    return outputs
+
+def postprocess_outputs(dest_dir_path, jobs=4):
+    formats = compression_formats()
+    stats = PostprocessStats()
+    outputs = discover_outputs(dest_dir_path)
+    # zlib and brotli release the GIL, so threads compress in parallel
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        for file_stats in executor.map(lambda path: postprocess_file(path, formats), outputs):
+            stats.merge(file_stats)
+    return stats
@@ -0,0 +1,60 @@
+import json
+import re
+from contextlib import contextmanager
+
+INDEX_VERSION = 1
+TERM_PATTERN = re.compile(r"[^\W_]{2,}")
+
+_active_text = None
+
+@contextmanager
+def collect_text():
+    # while active, inline text produced by the Markdown parser is appended
+    # to the yielded list, so indexing needs no second pass over the page
+    global _active_text
+    previous = _active_text
+    _active_text = []
+    try:
+        yield _active_text
+    finally:
+        _active_text = previous
+
+def active_text():
+    return _active_text
+
+def page_terms(*texts):
+    terms = set()
+    for text in texts:
+        terms.update(TERM_PATTERN.findall(text.lower()))
+    return sorted(terms)
+
+class SearchIndex:
+    # An inverted index: each term maps to the ids of the pages containing it,
+    # stored as gaps between sorted ids to keep the JSON small.
+    def __init__(self):
+        self.pages = []
+        self.postings = {}
+
+    def add(self, url, title, terms):
+        page_id = len(self.pages)
+        self.pages.append([url, title])
+        for term in terms:
+            self.postings.setdefault(term, []).append(page_id)
+
+    def to_dict(self):
+        terms = {}
+        for term in sorted(self.postings):
+            ids = self.postings[term]
+            terms[term] = [ids[0]] + [b - a for a, b in zip(ids, ids[1:])]
+        return {"version": INDEX_VERSION, "pages": self.pages, "terms": terms}
+
+    def write(self, sink):
+        json.dump(self.to_dict(), sink, separators=(",", ":"), ensure_ascii=False)
+
+def decode_postings(gaps):
+    ids = []
+    total = 0
+    for gap in gaps:
+        total += gap
+        ids.append(total)
+    return ids
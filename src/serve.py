@@ -0,0 +1,148 @@
+import argparse
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from main import add_serve_arguments, build, dir_path_content, dir_path_public, dir_path_static, template_path, templates_dir
+from watch import SiteWatcher
+
+LIVERELOAD_PATH = "/__livereload"
+LIVERELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVERELOAD_PATH}").onmessage = function () {{ location.reload(); }};</script>'
+)
+
+class ReloadSignal:
+    def __init__(self):
+        self.version = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait(self, version, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+class SiteRequestHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, reload_signal=None, basepath="/", **kwargs):
+        self.reload_signal = reload_signal
+        # pages link under basepath, so docs/ is served from there
+        self.prefix = basepath.rstrip("/")
+        super().__init__(*args, **kwargs)
+
+    def in_basepath(self):
+        path = self.path.split("?", 1)[0].split("#", 1)[0]
+        return path == self.prefix or path.startswith(self.prefix + "/")
+
+    def translate_path(self, path):
+        return super().translate_path(path[len(self.prefix):] or "/")
+
+    def do_HEAD(self):
+        if not self.in_basepath():
+            return self.send_error(404, f"Not under {self.prefix}/")
+        return super().do_HEAD()
+
+    def do_GET(self):
+        if self.path == LIVERELOAD_PATH and self.reload_signal is not None:
+            return self.stream_reload_events()
+        if not self.in_basepath():
+            return self.send_error(404, f"Not under {self.prefix}/")
+        if self.reload_signal is None:
+            return super().do_GET()
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if path.endswith(".html") and os.path.isfile(path):
+            return self.send_html_with_livereload(path)
+        return super().do_GET()
+
+    def send_html_with_livereload(self, path):
+        with open(path, "r") as f:
+            html = f.read()
+        if "</body>" in html:
+            html = html.replace("</body>", f"{LIVERELOAD_SCRIPT}</body>", 1)
+        else:
+            html += LIVERELOAD_SCRIPT
+        body = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_reload_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        version = self.reload_signal.version
+        try:
+            while True:
+                new_version = self.reload_signal.wait(version, timeout=15)
+                if new_version != version:
+                    version = new_version
+                    self.wfile.write(b"data: reload\n\n")
+                else:
+                    # keeps the connection alive and notices closed tabs
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the site and serve it locally")
+    add_serve_arguments(parser)
+    return parser.parse_args()
+
+def main():
+    run(parse_args())
+
+def run(args):
+    build(args.basepath, listings=args.listing, page_size=args.page_size)
+
+    reload_signal = ReloadSignal() if args.livereload else None
+
+    def handler(*handler_args, **handler_kwargs):
+        return SiteRequestHandler(
+            *handler_args,
+            directory=dir_path_public,
+            reload_signal=reload_signal,
+            basepath=args.basepath,
+            **handler_kwargs,
+        )
+
+    server = ThreadingHTTPServer(("", args.port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving {dir_path_public} at http://localhost:{args.port}{args.basepath}")
+
+    try:
+        if not args.watch:
+            threading.Event().wait()
+        print("Watching for changes...")
+        watcher = SiteWatcher(
+            dir_path_content,
+            dir_path_static,
+            template_path,
+            dir_path_public,
+            args.basepath,
+            templates_dir,
+            listings=args.listing,
+            page_size=args.page_size,
+        )
+        while True:
+            time.sleep(args.interval)
+            if watcher.poll() and reload_signal is not None:
+                reload_signal.notify()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
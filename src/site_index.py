@@ -0,0 +1,250 @@
+import bisect
+import hashlib
+import os
+import posixpath
+
+from front_matter import split_front_matter
+from template import select_template
+from markdown_blocks import BlockType, block_lines_to_block_type, strip_block_lines
+from textnode import TextType, text_to_textnodes
+
+class PageInfo:
+    __slots__ = ("source", "dest", "url", "template", "title", "hash", "links", "images", "metadata")
+
+    def __init__(self, source, dest, url, template, title, content_hash, links, images, metadata=None):
+        self.source = source
+        self.dest = dest
+        self.url = url
+        self.template = template
+        self.title = title
+        self.hash = content_hash
+        # (url, line) pairs, line numbers 1-based
+        self.links = links
+        self.images = images
+        self.metadata = metadata if metadata is not None else {}
+
+    @property
+    def draft(self):
+        return self.metadata.get("draft") is True
+
+    def __repr__(self):
+        return f"PageInfo({self.source}, {self.url}, {self.title!r})"
+
+def extract_title(md):
+    lines = md.split("\n")
+    for line in lines:
+        if line.startswith("# "):
+            return line[2:]
+    raise ValueError("no title found")
+
+def discover_pages(dir_path_content, dest_dir_path):
+    pages = []
+    for filename in sorted(os.listdir(dir_path_content)):
+        from_path = os.path.join(dir_path_content, filename)
+        if os.path.isfile(from_path):
+            pages.append((from_path, os.path.join(dest_dir_path, "index.html")))
+        else:
+            dest_path = os.path.join(dest_dir_path, filename)
+            pages.extend(discover_pages(from_path, dest_path))
+    return pages
+
+def output_url(dest_path, dest_dir_path):
+    # docs/blog/tom/index.html -> /blog/tom/
+    relative = os.path.relpath(dest_path, dest_dir_path).replace(os.sep, "/")
+    directory = posixpath.dirname(relative)
+    return "/" if directory == "" else f"/{directory}/"
+
+SOURCE_FORMS = {
+    TextType.TEXT: "{text}",
+    TextType.BOLD: "**{text}**",
+    TextType.ITALIC: "_{text}_",
+    TextType.CODE: "`{text}`",
+    TextType.LINK: "[{text}]({url})",
+    TextType.IMAGE: "![{text}]({url})",
+}
+
+def iter_numbered_blocks(lines, first_line):
+    # the blocks the renderer sees, each as (line number, stripped line) pairs
+    group = []
+    for number, line in enumerate(lines + [""], first_line):
+        if line != "":
+            group.append((number, line))
+            continue
+        if group:
+            stripped = strip_block_lines([line for _, line in group])
+            skip = 0
+            while skip < len(group) - 1 and group[skip][1].strip() == "":
+                skip += 1
+            yield [(number, line) for (number, _), line in zip(group[skip:], stripped)]
+            group = []
+
+def inline_texts(block):
+    # (text, [(offset, line number)]) for each string the renderer hands to
+    # text_to_textnodes; code blocks have none
+    lines = [line for _, line in block]
+    block_type = block_lines_to_block_type(lines)
+    if block_type == BlockType.CODE:
+        return []
+    if block_type in (BlockType.ULIST, BlockType.OLIST):
+        marker = 2 if block_type == BlockType.ULIST else 3
+        return [(line[marker:], [(0, number)]) for number, line in block]
+    if block_type == BlockType.HEADING:
+        level = len(lines[0]) - len(lines[0].lstrip("#"))
+        pieces = [(block[0][0], lines[0][level + 1:])] + block[1:]
+        separator = "\n"
+    elif block_type == BlockType.QUOTE:
+        pieces = [(number, line.lstrip(">").strip()) for number, line in block]
+        separator = " "
+    else:
+        pieces = block
+        separator = " "
+    starts = []
+    offset = 0
+    for number, piece in pieces:
+        starts.append((offset, number))
+        offset += len(piece) + len(separator)
+    return [(separator.join(piece for _, piece in pieces), starts)]
+
+def scan_references(lines, first_line=1):
+    # Links and images as the renderer parses them, with the line they start
+    # on. Each node's source form is found in turn to place it in the text;
+    # blocks that fail to parse are left for the build to report.
+    links = []
+    images = []
+    for block in iter_numbered_blocks(list(lines), first_line):
+        if not any("](" in line for _, line in block):
+            continue
+        for text, starts in inline_texts(block):
+            try:
+                nodes = text_to_textnodes(text)
+            except ValueError:
+                continue
+            pos = 0
+            for node in nodes:
+                source = SOURCE_FORMS.get(node.text_type, "{text}").format(text=node.text, url=node.url)
+                found = text.find(source, pos)
+                if found != -1:
+                    pos = found
+                if node.text_type in (TextType.LINK, TextType.IMAGE):
+                    number = starts[bisect.bisect_right(starts, (pos, float("inf"))) - 1][1]
+                    (links if node.text_type == TextType.LINK else images).append((node.url, number))
+                if found != -1:
+                    pos = found + len(source)
+    return links, images
+
+def scan_page(from_path):
+    # everything discovery needs from a source, in the form the metadata store keeps
+    with open(from_path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        data = f.read()
+    # universal newlines, as the renderer reads sources in text mode
+    lines = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    try:
+        metadata, body = split_front_matter(lines)
+        body = list(body)
+    except ValueError:
+        # rendering reports the broken header against the page
+        metadata, body = {}, lines
+    title = metadata.get("title")
+    if title is None:
+        try:
+            title = extract_title("\n".join(body))
+        except ValueError:
+            title = None
+    links, images = scan_references(body, len(lines) - len(body) + 1)
+    return {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "hash": hashlib.sha256(data).hexdigest(),
+        "title": None if title is None else str(title),
+        "metadata": metadata,
+        "links": links,
+        "images": images,
+    }
+
+class SiteIndex:
+    def __init__(self, dir_path_content, dest_dir_path):
+        self.dir_path_content = dir_path_content
+        self.dest_dir_path = dest_dir_path
+        self.pages = {}
+        self.by_url = {}
+        self.inbound = {}
+
+    @classmethod
+    def build(cls, dir_path_content, dest_dir_path, template_path, templates_dir=None, *, store=None, include_drafts=False):
+        # Every changed source is read exactly once here and unchanged ones not
+        # at all when a metadata store is given; later phases query the index.
+        index = cls(dir_path_content, dest_dir_path)
+        for from_path, dest_path in discover_pages(dir_path_content, dest_dir_path):
+            entry = store.lookup(from_path) if store is not None else None
+            if entry is None:
+                entry = scan_page(from_path)
+            if store is not None:
+                store.record(from_path, entry)
+            metadata = entry["metadata"]
+            if metadata.get("draft") is True and not include_drafts:
+                continue
+            page_template_path = select_template(
+                from_path, dir_path_content, template_path, templates_dir, metadata.get("template")
+            )
+            index.add(PageInfo(
+                from_path,
+                dest_path,
+                output_url(dest_path, dest_dir_path),
+                page_template_path,
+                entry["title"],
+                entry["hash"],
+                [tuple(link) for link in entry["links"]],
+                [tuple(image) for image in entry["images"]],
+                metadata,
+            ))
+        return index
+
+    def add(self, page):
+        self.pages[page.source] = page
+        self.by_url[page.url] = page
+        for url, _ in page.links:
+            target = normalize_url(url)
+            if target is not None:
+                self.inbound.setdefault(target, []).append(page.source)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __iter__(self):
+        return iter(self.pages.values())
+
+    def page(self, from_path):
+        return self.pages.get(from_path)
+
+    def page_for_url(self, url):
+        target = normalize_url(url)
+        return None if target is None else self.by_url.get(target)
+
+    def outbound(self, from_path):
+        page = self.pages[from_path]
+        targets = []
+        for url, _ in page.links:
+            target = self.page_for_url(url)
+            if target is not None and target not in targets:
+                targets.append(target)
+        return targets
+
+    def linked_from(self, url):
+        target = normalize_url(url)
+        return list(dict.fromkeys(self.inbound.get(target, [])))
+
+    def render_list(self):
+        return [(page.source, page.template, page.dest) for page in self.pages.values()]
+
+def normalize_url(url):
+    # Maps an internal page link to the index's URL form; external links,
+    # fragments-only links and relative links return None.
+    if not url.startswith("/") or url.startswith("//"):
+        return None
+    path = url.split("#", 1)[0].split("?", 1)[0]
+    if path.endswith("/index.html"):
+        path = path[: -len("index.html")]
+    elif not path.endswith("/"):
+        path += "/"
+    return path
@@ -0,0 +1,79 @@
+import os
+import re
+
+from htmlnode import rewrite_url
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+URL_ATTRIBUTE_PATTERN = re.compile(r'\b(href|src)="([^"]*)"')
+
+class Template:
+    def __init__(self, source=None, parts=None):
+        # literal text and slot names alternate: [text, slot, text, slot, ..., text]
+        self.parts = parts if parts is not None else PLACEHOLDER_PATTERN.split(source)
+        self.rebased = {}
+
+    @property
+    def slots(self):
+        return self.parts[1::2]
+
+    def with_basepath(self, basepath, asset_urls=None):
+        if basepath == "/" and asset_urls is None:
+            return self
+        key = (basepath, asset_urls.signature if asset_urls is not None else None)
+        if key not in self.rebased:
+
+            def rewrite(match):
+                return f'{match.group(1)}="{rewrite_url(match.group(2), basepath, asset_urls)}"'
+
+            parts = [
+                URL_ATTRIBUTE_PATTERN.sub(rewrite, part) if i % 2 == 0 else part
+                for i, part in enumerate(self.parts)
+            ]
+            self.rebased[key] = Template(parts=parts)
+        return self.rebased[key]
+
+    def render(self, sink, values):
+        for i, part in enumerate(self.parts):
+            if i % 2 == 0:
+                if part:
+                    sink.write(part)
+                continue
+            if part not in values:
+                sink.write(f"{{{{ {part} }}}}")
+                continue
+            value = values[part]
+            if isinstance(value, str):
+                sink.write(value)
+            else:
+                value.write_html(sink)
+
+_template_cache = {}
+
+def load_template(template_path):
+    mtime = os.stat(template_path).st_mtime_ns
+    cached = _template_cache.get(template_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(template_path, "r") as f:
+        template = Template(f.read())
+    _template_cache[template_path] = (mtime, template)
+    return template
+
+def named_template_path(templates_dir, name):
+    return os.path.join(templates_dir, f"{name}.html")
+
+def select_template(from_path, dir_path_content, default_template_path, templates_dir=None, name=None):
+    # A `template: name` front matter key picks templates/<name>.html (a missing
+    # one fails the page); otherwise pages under content/<section>/ use
+    # templates/<section>.html when it exists.
+    if templates_dir is None:
+        return default_template_path
+    if name:
+        return named_template_path(templates_dir, name)
+    relative_path = os.path.relpath(from_path, dir_path_content)
+    section = relative_path.split(os.sep, 1)[0] if os.sep in relative_path else ""
+    if section:
+        template_path = named_template_path(templates_dir, section)
+        if os.path.isfile(template_path):
+            return template_path
+    return default_template_path
@@ -0,0 +1,67 @@
+import os
+import unittest
+
+from assets import publish_assets, publish_file
+from fixtures import TempDirTestCase
+from generate_content import copy_files_recursive
+
+
+class TestPublishAssets(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "a" * 100)
+
+    def test_copy_then_skip_unchanged(self):
+        stats = copy_files_recursive(self.static, self.public)
+        self.assertEqual((stats.copied, stats.skipped, stats.bytes_written), (2, 0, 107))
+
+        stats = copy_files_recursive(self.static, self.public)
+        self.assertEqual((stats.copied, stats.skipped, stats.bytes_written), (0, 2, 0))
+
+    def test_changed_asset_is_copied_again(self):
+        copy_files_recursive(self.static, self.public)
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        stats = copy_files_recursive(self.static, self.public)
+        self.assertEqual((stats.copied, stats.skipped), (1, 1))
+        with open(os.path.join(self.public, "index.css")) as f:
+            self.assertEqual(f.read(), "body { margin: 0 }")
+
+    def test_identical_content_is_not_rewritten(self):
+        copy_files_recursive(self.static, self.public)
+        from_path = os.path.join(self.static, "index.css")
+        dest_path = os.path.join(self.public, "index.css")
+        os.utime(from_path, ns=(1, 1))
+        inode = os.stat(dest_path).st_ino
+        stats = copy_files_recursive(self.static, self.public)
+        self.assertEqual((stats.copied, stats.skipped), (0, 2))
+        self.assertEqual(os.stat(dest_path).st_ino, inode)
+        self.assertEqual(os.stat(dest_path).st_mtime_ns, 1)
+
+    def test_hardlink_mode(self):
+        stats = copy_files_recursive(self.static, self.public, mode="hardlink")
+        self.assertEqual((stats.linked, stats.bytes_written), (2, 0))
+        self.assertTrue(os.path.samefile(
+            os.path.join(self.static, "index.css"),
+            os.path.join(self.public, "index.css"),
+        ))
+        stats = copy_files_recursive(self.static, self.public, mode="hardlink")
+        self.assertEqual(stats.skipped, 2)
+
+    def test_reflink_falls_back_to_copy(self):
+        from_path = os.path.join(self.static, "index.css")
+        dest_path = os.path.join(self.public, "index.css")
+        os.makedirs(self.public)
+        self.assertIn(publish_file(from_path, dest_path, "reflink"), ("linked", "copied"))
+        with open(dest_path) as f:
+            self.assertEqual(f.read(), "body {}")
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            publish_assets([], mode="symlink")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+from block_cache import BlockCache
+from markdown_blocks import block_to_html_node, markdown_to_html_node
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_output_matches_uncached(self):
+        md = "# Title\n\nSome **bold** [link](/x)\n\n- a\n- b\n\n```\ncode\n```"
+        cache = BlockCache()
+        self.assertEqual(markdown_to_html_node(md, cache).to_html(), markdown_to_html_node(md).to_html())
+
+    def test_repeated_blocks_hit(self):
+        cache = BlockCache()
+        md = "Shared footer\n\nUnique one\n\nShared footer"
+        markdown_to_html_node(md, cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        markdown_to_html_node("Shared footer", cache)
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_basepath_is_baked_into_fragments(self):
+        cache = BlockCache("/site/")
+        node = cache.render("[home](/index.html)", block_to_html_node)
+        self.assertEqual(node.to_html(), '<p><a href="/site/index.html">home</a></p>')
+        self.assertEqual(cache.render("[home](/index.html)", block_to_html_node).to_html(), node.to_html())
+
+    def test_lru_eviction_by_size(self):
+        cache = BlockCache(max_bytes=40)
+        cache.put("a", "x" * 20)
+        cache.put("b", "y" * 20)
+        cache.get("a")
+        cache.put("c", "z" * 20)
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertEqual(cache.size, 40)
+        cache.put("d", "w" * 50)
+        self.assertIsNone(cache.get("d"))
+
+    def test_new_blocks_are_handed_back(self):
+        cache = BlockCache()
+        markdown_to_html_node("old", cache)
+        cache.track_new()
+        markdown_to_html_node("old\n\nnew", cache)
+        self.assertEqual(cache.take_new(), [(BlockCache.key("new"), "<p>new</p>", "new")])
+        self.assertIsNone(cache.new_keys)
+
+        merged = BlockCache()
+        merged.merge(cache.items())
+        self.assertEqual(merged.items(), cache.items())
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "blocks.json")
+            cache = BlockCache("/site/")
+            markdown_to_html_node("one\n\ntwo", cache)
+            cache.save(path)
+
+            loaded = BlockCache("/site/")
+            loaded.load(path)
+            markdown_to_html_node("one\n\ntwo", loaded)
+            self.assertEqual((loaded.hits, loaded.misses), (2, 0))
+
+            other_basepath = BlockCache("/")
+            other_basepath.load(path)
+            self.assertEqual(len(other_basepath.entries), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import unittest
+
+from check_links import BrokenReference, asset_urls, check_links, output_urls, resolve
+from fixtures import TempDirTestCase
+from manifest import BuildManifest
+from site_index import SiteIndex
+
+
+class TestResolve(unittest.TestCase):
+    def test_absolute(self):
+        self.assertEqual(resolve("/blog/tom/", "/"), "/blog/tom/")
+        self.assertEqual(resolve("/images/a.png#x", "/"), "/images/a.png")
+
+    def test_relative(self):
+        self.assertEqual(resolve("a.png", "/blog/tom/"), "/blog/tom/a.png")
+        self.assertEqual(resolve("../", "/blog/tom/"), "/blog/")
+
+    def test_external(self):
+        for url in ["https://example.com", "//cdn.example.com/a.js", "mailto:a@b.c", "#top", ""]:
+            self.assertIsNone(resolve(url, "/"))
+
+
+class TestCheckLinks(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.template, "{{ Content }}")
+        self.write(os.path.join(self.static, "images", "ok.png"), "png")
+        self.write(os.path.join(self.static, "index.css"), "css")
+        self.write(
+            os.path.join(self.content, "index.md"),
+            "# Home\n\n[blog](/blog) [css](/index.css) [gone](/missing)\n\n"
+            "![ok](/images/ok.png)\n\n![bad](/images/bad.png)\n\n```\n[code](/not-checked)\n```",
+        )
+        self.write(
+            os.path.join(self.content, "blog", "index.md"),
+            "# Blog\n\n[home](../) [self](./) [web](https://example.com) [up](../nope/)",
+        )
+
+    def expected(self):
+        home = os.path.join(self.content, "index.md")
+        blog = os.path.join(self.content, "blog", "index.md")
+        return [
+            BrokenReference(blog, 3, "link", "../nope/"),
+            BrokenReference(home, 3, "link", "/missing"),
+            BrokenReference(home, 7, "image", "/images/bad.png"),
+        ]
+
+    def test_asset_urls(self):
+        self.assertEqual(asset_urls(self.static), {"/images/ok.png", "/index.css"})
+
+    def test_broken_references(self):
+        index = SiteIndex.build(self.content, self.public, self.template)
+        self.assertEqual(check_links(index, asset_urls(self.static)), self.expected())
+
+    def test_parallel(self):
+        index = SiteIndex.build(self.content, self.public, self.template)
+        self.assertEqual(check_links(index, asset_urls(self.static), jobs=2), self.expected())
+
+    def test_generated_outputs(self):
+        self.write(os.path.join(self.content, "news.md"), "# News\n\n[tag](/blog/tags/x/) [feed](/feed.xml)")
+        manifest = BuildManifest(
+            os.path.join(self.tmp.name, "manifest.json"),
+            pages={
+                "listing:/blog/tags/x/": {"dest": os.path.join(self.public, "blog", "tags", "x", "index.html")},
+                "output:feed.xml": {"dest": os.path.join(self.public, "feed.xml")},
+            },
+        )
+        outputs = output_urls(manifest, self.public)
+        self.assertEqual(outputs, {"/blog/tags/x/index.html", "/feed.xml"})
+        index = SiteIndex.build(self.content, self.public, self.template)
+        self.assertEqual(check_links(index, asset_urls(self.static), outputs=outputs), self.expected())
+
+    def test_report_line(self):
+        reference = BrokenReference("content/index.md", 3, "link", "/missing")
+        self.assertEqual(str(reference), "content/index.md:3: missing link /missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
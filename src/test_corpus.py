@@ -0,0 +1,30 @@
+import os
+import random
+import tempfile
+import unittest
+
+from corpus import page, reference_page, write_corpus
+from generate_content import discover_pages
+from markdown_blocks import markdown_to_html_node
+
+
+class TestCorpus(unittest.TestCase):
+    def test_generated_pages_render(self):
+        rng = random.Random(1)
+        for markdown in [page(rng, "Title"), reference_page(rng, 1)]:
+            html = markdown_to_html_node(markdown).to_html()
+            self.assertTrue(html.startswith("<div><h1>"))
+
+    def test_write_corpus_is_deterministic(self):
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            written = write_corpus(first, 30, seed=3)
+            write_corpus(second, 30, seed=3)
+            self.assertEqual(len(written), 31)
+            self.assertEqual(len(discover_pages(first, "out")), 31)
+            for path in written:
+                with open(path) as a, open(os.path.join(second, os.path.relpath(path, first))) as b:
+                    self.assertEqual(a.read(), b.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import unittest
+
+from feeds import absolute_url, feed_entries, write_feed, write_sitemap
+from fixtures import TempDirTestCase
+from site_index import PageInfo
+
+
+def page(url, title, metadata=None):
+    return PageInfo(f"content{url}index.md", f"docs{url}index.html", url, "template.html", title, "", [], [], metadata)
+
+
+class TestFeeds(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pages = [
+            page("/", "Home"),
+            page("/blog/old/", "Old", {"date": "2023-01-02"}),
+            page("/blog/new/", "New & shiny", {"date": "2024-05-06 10:00", "description": "a <new> post"}),
+            page("/blog/undated/", "Undated", {"date": "someday"}),
+        ]
+
+    def read(self, name):
+        with open(os.path.join(self.tmp.name, name)) as f:
+            return f.read()
+
+    def test_absolute_url(self):
+        self.assertEqual(absolute_url("https://x.org/", "/site/", "/blog/"), "https://x.org/site/blog/")
+        self.assertEqual(absolute_url("https://x.org", "/", "/"), "https://x.org/")
+
+    def test_sitemap(self):
+        path = os.path.join(self.tmp.name, "sitemap.xml")
+        write_sitemap(path, self.pages, "https://x.org", "/site/", ["/blog/page/2/"])
+        sitemap = self.read("sitemap.xml")
+        self.assertIn("<url><loc>https://x.org/site/</loc></url>", sitemap)
+        self.assertIn("<url><loc>https://x.org/site/blog/old/</loc><lastmod>2023-01-02</lastmod></url>", sitemap)
+        self.assertIn("<loc>https://x.org/site/blog/page/2/</loc>", sitemap)
+        self.assertTrue(sitemap.endswith("</urlset>\n"))
+
+    def test_feed_has_dated_pages_newest_first(self):
+        self.assertEqual([p.url for _, p in feed_entries(self.pages)], ["/blog/new/", "/blog/old/"])
+        path = os.path.join(self.tmp.name, "feed.xml")
+        write_feed(path, self.pages, "https://x.org", "/", "Home")
+        feed = self.read("feed.xml")
+        self.assertIn("<updated>2024-05-06T00:00:00Z</updated>\n", feed)
+        self.assertIn("<title>New &amp; shiny</title>", feed)
+        self.assertIn("<summary>a &lt;new&gt; post</summary>", feed)
+        self.assertNotIn("Undated", feed)
+
+    def test_unchanged_feed_is_not_rewritten(self):
+        path = os.path.join(self.tmp.name, "feed.xml")
+        write_feed(path, self.pages, "https://x.org", "/", "Home")
+        os.utime(path, ns=(0, 0))
+        write_feed(path, self.pages, "https://x.org", "/", "Home")
+        self.assertEqual(os.stat(path).st_mtime_ns, 0)
+        write_feed(path, self.pages[:2], "https://x.org", "/", "Home")
+        self.assertNotEqual(os.stat(path).st_mtime_ns, 0)
+        self.assertEqual(os.listdir(self.tmp.name), ["feed.xml"])
+
+
+if __name__ == "__main__":
+    unittest.main()
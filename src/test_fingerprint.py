@@ -0,0 +1,71 @@
+import json
+import os
+import unittest
+
+from fingerprint import AssetUrls, fingerprinted_path
+from fixtures import TempDirTestCase
+from generate_content import copy_files_recursive
+from htmlnode import LeafNode, ParentNode, apply_basepath
+from manifest import BuildManifest
+from template import Template
+
+
+class TestAssetUrls(unittest.TestCase):
+    def setUp(self):
+        self.urls = AssetUrls({"/index.css": "/index.0123456789.css", "/images/a.png": "/images/a.abcdef0123.png"})
+
+    def test_fingerprinted_path(self):
+        self.assertEqual(fingerprinted_path("docs/images/a.png", "abcdef0123456789"), "docs/images/a.abcdef0123.png")
+
+    def test_lookup_keeps_query_and_fragment(self):
+        self.assertEqual(self.urls.lookup("/index.css?v=1#x"), "/index.0123456789.css?v=1#x")
+        self.assertEqual(self.urls.lookup("/blog/"), "/blog/")
+        self.assertEqual(self.urls.lookup("//cdn.example.com/index.css"), "//cdn.example.com/index.css")
+
+    def test_signature_follows_contents(self):
+        signature = self.urls.signature
+        self.urls.add("/b.png", "/b.1111111111.png")
+        self.assertNotEqual(self.urls.signature, signature)
+
+    def test_nodes_and_templates_are_rewritten(self):
+        root = ParentNode("p", [LeafNode("img", "", {"src": "/images/a.png"}), LeafNode("a", "x", {"href": "/blog/"})])
+        apply_basepath(root, "/", self.urls)
+        self.assertEqual(root.to_html(), '<p><img src="/images/a.abcdef0123.png"></img><a href="/blog/">x</a></p>')
+        template = Template('<link href="/index.css" />{{ Content }}').with_basepath("/site/", self.urls)
+        self.assertEqual(template.parts[0], '<link href="/site/index.0123456789.css" />')
+
+
+class TestFingerprintAssets(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "robots.txt"), "User-agent: *")
+
+    def test_publishes_under_hashed_names(self):
+        manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        urls = AssetUrls()
+        copy_files_recursive(self.static, self.public, manifest, asset_urls=urls)
+        css = urls.lookup("/index.css")
+        self.assertRegex(css, r"^/index\.[0-9a-f]{10}\.css$")
+        self.assertEqual(sorted(os.listdir(self.public)), sorted([css[1:], "robots.txt"]))
+        self.assertEqual({entry["dest"] for entry in manifest.new_assets.values()}, {
+            os.path.join(self.public, css[1:]), os.path.join(self.public, "robots.txt")
+        })
+        urls.write(os.path.join(self.public, "asset-manifest.json"))
+        with open(os.path.join(self.public, "asset-manifest.json")) as f:
+            self.assertEqual(json.load(f), {"/index.css": css})
+
+    def test_hash_is_reused_while_size_and_mtime_hold(self):
+        path = os.path.join(self.static, "index.css")
+        previous = BuildManifest(None)
+        previous.record_asset(path, previous.asset_entry(path, "unused"))
+        manifest = BuildManifest(None, assets={path: dict(previous.new_assets[path], hash="f" * 64)})
+        urls = AssetUrls()
+        copy_files_recursive(self.static, self.public, manifest, asset_urls=urls)
+        self.assertEqual(urls.lookup("/index.css"), "/index.ffffffffff.css")
+
+
+if __name__ == "__main__":
+    unittest.main()
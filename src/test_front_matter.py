@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+from front_matter import parse_front_matter, read_front_matter, split_front_matter, template_values
+
+
+class TestParseFrontMatter(unittest.TestCase):
+    def test_values(self):
+        metadata = parse_front_matter([
+            "Title: Why Glorfindel is More Impressive than Legolas",
+            "date: 2024-05-01",
+            "tags: [elves, 'first age']",
+            "draft: false",
+            "# a comment",
+            "",
+            "authors:",
+            "  - Tolkien",
+            '  - "Christopher Tolkien"',
+        ])
+        self.assertEqual(
+            metadata,
+            {
+                "title": "Why Glorfindel is More Impressive than Legolas",
+                "date": "2024-05-01",
+                "tags": ["elves", "first age"],
+                "draft": False,
+                "authors": ["Tolkien", "Christopher Tolkien"],
+            },
+        )
+
+    def test_colon_in_value(self):
+        self.assertEqual(parse_front_matter(["link: https://example.com/a"]), {"link": "https://example.com/a"})
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError) as cm:
+            parse_front_matter(["title: ok", "not a pair"])
+        self.assertIn("line 3", str(cm.exception))
+
+    def test_empty_value_is_dropped_unless_items_follow(self):
+        metadata = parse_front_matter(["title:", "tags:", "  - elves", "draft: true", "empty: []"])
+        self.assertEqual(metadata, {"tags": ["elves"], "draft": True, "empty": []})
+
+    def test_list_item_without_key(self):
+        with self.assertRaises(ValueError):
+            parse_front_matter(["- orphan"])
+
+
+class TestSplitFrontMatter(unittest.TestCase):
+    def test_stops_at_closing_delimiter(self):
+        def lines():
+            yield "---"
+            yield "title: Hi"
+            yield "---"
+            yield "# Body"
+            raise AssertionError("read past the header")
+
+        metadata, body = split_front_matter(lines())
+        self.assertEqual(metadata, {"title": "Hi"})
+        self.assertEqual(next(body), "# Body")
+
+    def test_no_front_matter(self):
+        metadata, body = split_front_matter(["# Title", "", "text"])
+        self.assertEqual((metadata, list(body)), ({}, ["# Title", "", "text"]))
+
+    def test_unclosed_header_is_body(self):
+        metadata, body = split_front_matter(["---", "title: Hi", "# Title"])
+        self.assertEqual((metadata, list(body)), ({}, ["---", "title: Hi", "# Title"]))
+
+    def test_read_front_matter(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "index.md")
+            with open(path, "w") as f:
+                f.write("---\ntags: [a, b]\ntemplate: post\n---\n# Title\n")
+            self.assertEqual(read_front_matter(path), {"tags": ["a", "b"], "template": "post"})
+
+
+class TestTemplateValues(unittest.TestCase):
+    def test_formatting(self):
+        self.assertEqual(
+            template_values({"tags": ["a", "b"], "draft": True, "date": "2024-05-01"}),
+            {"tags": "a, b", "draft": "true", "date": "2024-05-01"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
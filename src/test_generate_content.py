@@ -1,6 +1,13 @@
+import os
 import unittest
 
-from generate_content import extract_title
+from fixtures import TempDirTestCase
+from generate_content import (
+    PageBuildError,
+    discover_pages,
+    extract_title,
+    generate_pages_recursive,
+)
 
 
 class TestExtractTitle(unittest.TestCase):
@@ -46,5 +53,80 @@ no title
             pass
 
 
+class TestGeneratePages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        for name in ["a", "b", "c", "d"]:
+            os.makedirs(os.path.join(self.content, name))
+            self.write(os.path.join(self.content, name, "index.md"), f"# Page {name}\n\nbody {name}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+
+    def read_outputs(self):
+        outputs = {}
+        for from_path, dest_path in discover_pages(self.content, self.public):
+            with open(dest_path) as f:
+                outputs[dest_path] = f.read()
+        return outputs
+
+    def test_discover_pages_is_sorted(self):
+        pages = discover_pages(self.content, self.public)
+        self.assertEqual(
+            [dest for _, dest in pages],
+            [
+                os.path.join(self.public, "a", "index.html"),
+                os.path.join(self.public, "b", "index.html"),
+                os.path.join(self.public, "c", "index.html"),
+                os.path.join(self.public, "d", "index.html"),
+                os.path.join(self.public, "index.html"),
+            ],
+        )
+
+    def test_parallel_matches_sequential(self):
+        generate_pages_recursive(self.content, self.template, self.public, "/")
+        sequential = self.read_outputs()
+        generate_pages_recursive(self.content, self.template, self.public, "/", jobs=3)
+        self.assertEqual(self.read_outputs(), sequential)
+        self.assertIn("<title>Page c</title>", sequential[os.path.join(self.public, "c", "index.html")])
+
+    def test_minified_pages_are_not_rewritten(self):
+        self.write(self.template, "<html>\n  <title>{{ Title }}</title>\n  {{ Content }}\n</html>\n")
+        results = generate_pages_recursive(self.content, self.template, self.public, "/", minify=True)
+        self.assertEqual({result["output"] for _, result in results}, {"written"})
+        minified = self.read_outputs()
+        self.assertEqual(minified[os.path.join(self.public, "index.html")], "<html> <title>Home</title> <div><h1>Home</h1></div> </html>")
+        for options in ({}, {"io_threads": 2}, {"jobs": 2}):
+            results = generate_pages_recursive(self.content, self.template, self.public, "/", minify=True, **options)
+            self.assertEqual({result["output"] for _, result in results}, {"skipped"})
+        self.assertEqual(self.read_outputs(), minified)
+
+    def test_worker_blocks_reach_the_shared_cache(self):
+        import block_cache
+        block_cache.configure(block_cache.DEFAULT_MAX_BYTES)
+        self.addCleanup(block_cache.configure, block_cache.DEFAULT_MAX_BYTES)
+        results = generate_pages_recursive(self.content, self.template, self.public, "/", jobs=2, cache_blocks=True)
+        self.assertNotIn("blocks", results[0][1])
+        # a heading and a paragraph for each of a-d, and the home heading
+        self.assertEqual(len(block_cache.shared_cache("/").entries), 9)
+
+    def test_parallel_errors_are_aggregated(self):
+        self.write(os.path.join(self.content, "a", "index.md"), "no title")
+        self.write(os.path.join(self.content, "c", "index.md"), "**unclosed")
+        with self.assertRaises(PageBuildError) as cm:
+            generate_pages_recursive(self.content, self.template, self.public, "/", jobs=2)
+        failed = [from_path for from_path, _ in cm.exception.failures]
+        self.assertEqual(
+            failed,
+            [
+                os.path.join(self.content, "a", "index.md"),
+                os.path.join(self.content, "c", "index.md"),
+            ],
+        )
+        self.assertTrue(os.path.exists(os.path.join(self.public, "b", "index.html")))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode, text_node_to_html_node
+from htmlnode import HTMLNode, LeafNode, ParentNode, apply_basepath, rebase_url, text_node_to_html_node
 from textnode import TextType, TextNode
 
 class TestHTMLNode(unittest.TestCase):
@@ -103,6 +104,81 @@ class TestHTMLNode(unittest.TestCase):
         expected_html = "<div><ul><li>Item 1</li><li>Item 2</li></ul></div>"
         self.assertEqual(outer_parent.to_html(), expected_html)
 
+    """Compact representation tests"""
+    def test_nodes_have_no_instance_dict(self):
+        for node in [HTMLNode(), LeafNode("b", "x"), ParentNode("p", [LeafNode(None, "x")])]:
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_empty_children_and_props_are_shared(self):
+        first = LeafNode(None, "a")
+        second = LeafNode("b", "b")
+        self.assertIs(first.children, second.children)
+        self.assertIs(first.props, second.props)
+
+    def test_shared_empty_values_are_read_only(self):
+        node = LeafNode(None, "a")
+        with self.assertRaises(TypeError):
+            node.props["href"] = "/x"
+        with self.assertRaises(TypeError):
+            node.children.append(LeafNode(None, "b"))
+        self.assertEqual(LeafNode(None, "c").props, {})
+
+    def test_set_prop_creates_props_lazily(self):
+        node = LeafNode("img", "")
+        node.set_prop("src", "/a.png")
+        node.set_prop("alt", "a")
+        self.assertEqual(node.props, {"src": "/a.png", "alt": "a"})
+        self.assertEqual(LeafNode("img", "").props, {})
+
+    """Streaming serialization tests"""
+    def test_write_html_matches_to_html(self):
+        inner = ParentNode(tag="ul", children=[LeafNode("li", "Item 1"), LeafNode("li", "Item 2")])
+        outer = ParentNode(tag="div", children=[LeafNode(None, "intro"), inner], props={"class": "list"})
+        sink = io.StringIO()
+        outer.write_html(sink)
+        self.assertEqual(sink.getvalue(), outer.to_html())
+        self.assertEqual(sink.getvalue(), '<div class="list">intro<ul><li>Item 1</li><li>Item 2</li></ul></div>')
+
+    def test_write_html_emits_fragments(self):
+        fragments = []
+
+        class ListSink:
+            def write(self, fragment):
+                fragments.append(fragment)
+
+        parent = ParentNode(tag="p", children=[LeafNode("b", "bold"), LeafNode(None, " text")])
+        parent.write_html(ListSink())
+        self.assertEqual(fragments, ["<p>", "<b>bold</b>", " text", "</p>"])
+
+    def test_write_html_wide_list(self):
+        items = [LeafNode("li", str(i)) for i in range(5000)]
+        html = ParentNode(tag="ul", children=items).to_html()
+        self.assertTrue(html.startswith("<ul><li>0</li><li>1</li>"))
+        self.assertTrue(html.endswith("<li>4999</li></ul>"))
+
+    def test_htmlnode_write_html_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            HTMLNode().write_html(io.StringIO())
+
+    """Basepath rewriting tests"""
+    def test_rebase_url(self):
+        self.assertEqual(rebase_url("/blog/tom", "/site/"), "/site/blog/tom")
+        self.assertEqual(rebase_url("https://example.com", "/site/"), "https://example.com")
+        self.assertEqual(rebase_url("//cdn.example.com/a.png", "/site/"), "//cdn.example.com/a.png")
+        self.assertEqual(rebase_url("/blog", "/"), "/blog")
+
+    def test_apply_basepath_rewrites_link_and_image_props(self):
+        link = LeafNode("a", "home", {"href": "/index.html"})
+        image = LeafNode("img", "", {"src": "/images/tom.png", "alt": "/not-a-url"})
+        code = ParentNode("pre", [ParentNode("code", [LeafNode(None, '<a href="/x">')])])
+        root = ParentNode("div", [ParentNode("p", [link, image]), code])
+        apply_basepath(root, "/site/")
+        self.assertEqual(
+            root.to_html(),
+            '<div><p><a href="/site/index.html">home</a><img src="/site/images/tom.png" alt="/not-a-url"></img></p>'
+            '<pre><code><a href="/x"></code></pre></div>',
+        )
+
     """TextNode to HTMLNode convertion tests"""
     def test_text_node_to_html_node_text(self):
         text_node = TextNode(text="Hello, world!", text_type=TextType.TEXT)
@@ -0,0 +1,103 @@
+import os
+import struct
+import unittest
+
+from fingerprint import AssetUrls
+from fixtures import TempDirTestCase
+from htmlnode import LeafNode, ParentNode, apply_basepath
+from images import Image, derivative_key, generate_derivatives, image_size, plan_derivatives
+from manifest import hash_file
+
+
+def png_header(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00"
+
+
+class TestImageSize(TempDirTestCase):
+    def image(self, name, data):
+        return self.write(os.path.join(self.tmp.name, name), data)
+
+    def test_png(self):
+        self.assertEqual(image_size(self.image("a.png", png_header(1344, 896))), (1344, 896))
+
+    def test_gif(self):
+        self.assertEqual(image_size(self.image("a.gif", b"GIF89a" + struct.pack("<HH", 40, 30) + b"\x00" * 8)), (40, 30))
+
+    def test_jpeg_skips_to_frame_header(self):
+        app0 = b"\xff\xe0" + struct.pack(">H", 6) + b"JFIF"
+        sof0 = b"\xff\xc0" + struct.pack(">HBHH", 11, 8, 300, 640) + b"\x01\x01\x11\x00"
+        self.assertEqual(image_size(self.image("a.jpg", b"\xff\xd8" + app0 + sof0)), (640, 300))
+
+    def test_webp(self):
+        riff = b"RIFF" + struct.pack("<I", 100) + b"WEBP"
+        lossy = riff + b"VP8 " + struct.pack("<I", 80) + b"\x00\x00\x00\x9d\x01\x2a" + struct.pack("<HH", 640, 480)
+        lossless = riff + b"VP8L" + struct.pack("<I", 80) + b"\x2f" + struct.pack("<I", (639) | (479 << 14))
+        extended = riff + b"VP8X" + struct.pack("<I", 10) + b"\x00" * 4 + (639).to_bytes(3, "little") + (479).to_bytes(3, "little")
+        for name, data in [("lossy", lossy), ("lossless", lossless), ("extended", extended)]:
+            self.assertEqual(image_size(self.image(f"{name}.webp", data)), (640, 480), name)
+
+    def test_unknown_format(self):
+        self.assertIsNone(image_size(self.image("a.png", b"not an image")))
+
+
+class TestDerivatives(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.cache = os.path.join(self.tmp.name, "cache")
+        self.source = self.write(os.path.join(self.static, "images", "a.png"), png_header(1000, 500))
+        self.assets = [(self.source, os.path.join(self.public, "images", "a.png"))]
+
+    def test_gifs_are_sized_but_not_resized(self):
+        source = self.write(os.path.join(self.static, "images", "b.gif"), b"GIF89a" + struct.pack("<HH", 1000, 500) + b"\x00" * 8)
+        urls = AssetUrls()
+        stats = generate_derivatives([(source, os.path.join(self.public, "images", "b.gif"))], self.public, self.cache, urls)
+        self.assertEqual((stats.images, stats.resized, stats.missing), (1, 0, 0))
+        self.assertEqual(urls.image("/images/b.gif"), {"width": 1000, "height": 500, "srcset": []})
+
+    def test_no_upscaling(self):
+        (_, url, size, derivatives), = plan_derivatives(self.assets, self.public, self.cache, (480, 1000, 1200))
+        self.assertEqual((url, size), ("/images/a.png", (1000, 500)))
+        self.assertEqual([width for width, _, _, _ in derivatives], [480])
+
+    def test_cached_derivatives_are_published_without_resizing(self):
+        self.write(os.path.join(self.cache, derivative_key(hash_file(self.source), 480) + ".png"), b"small")
+        urls = AssetUrls()
+        stats = generate_derivatives(self.assets, self.public, self.cache, urls, widths=(480,))
+        self.assertEqual((stats.images, stats.resized, stats.cached), (1, 0, 1))
+        with open(os.path.join(self.public, "images", "a-480w.png"), "rb") as f:
+            self.assertEqual(f.read(), b"small")
+        self.assertEqual(urls.image("/images/a.png")["srcset"], [["/images/a-480w.png", 480], ["/images/a.png", 1000]])
+
+    def test_image_props(self):
+        urls = AssetUrls()
+        urls.add_image("/images/a.png", 1000, 500, [("/images/a-480w.png", 480), ("/images/a.png", 1000)])
+        urls.add_image("/images/b.png", 40, 30)
+        root = ParentNode("p", [
+            LeafNode("img", "", {"src": "/images/a.png", "alt": "a"}),
+            LeafNode("img", "", {"src": "/images/b.png", "alt": "b"}),
+        ])
+        apply_basepath(root, "/site/", urls)
+        self.assertEqual(
+            root.to_html(),
+            '<p><img src="/site/images/a.png" alt="a" width="1000" height="500" '
+            'srcset="/site/images/a-480w.png 480w, /site/images/a.png 1000w" sizes="(max-width: 1000px) 100vw, 1000px"></img>'
+            '<img src="/site/images/b.png" alt="b" width="40" height="30"></img></p>',
+        )
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_resizes_missing_derivatives(self):
+        Image.new("RGB", (1000, 500)).save(self.source)
+        urls = AssetUrls()
+        stats = generate_derivatives(self.assets, self.public, self.cache, urls, widths=(480,), fingerprint=True)
+        self.assertEqual(stats.resized, 1)
+        (url, width), _ = urls.image("/images/a.png")["srcset"]
+        with Image.open(os.path.join(self.public, url[1:])) as image:
+            self.assertEqual(image.size, (480, 240))
+        stats = generate_derivatives(self.assets, self.public, self.cache, AssetUrls(), widths=(480,), fingerprint=True)
+        self.assertEqual((stats.resized, stats.cached), (0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from listings import generate_listings, listing_node, plan_listings, slugify
+from manifest import BuildManifest
+from site_index import SiteIndex
+
+
+class TestListings(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.manifest_path = os.path.join(self.tmp.name, "manifest.json")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.post("a", "2024-01-01", "[x]")
+        self.post("b", "2024-03-01", "[x, 'Old Forest']")
+        self.post("c", "2024-02-01", "[]")
+        self.post("d", "", "[]")
+        self.post("e", "2024-03-01", "[x]")
+
+    def post(self, name, date, tags):
+        self.write(
+            os.path.join(self.content, "blog", name, "index.md"),
+            f"---\ndate: {date}\ntags: {tags}\n---\n# Post {name}",
+        )
+
+    def index(self):
+        return SiteIndex.build(self.content, self.public, self.template)
+
+    def urls(self, listing):
+        return [post.url for post in listing.posts]
+
+    def test_plan(self):
+        listings = plan_listings(self.index(), ["blog"], page_size=2)
+        self.assertEqual(
+            [listing.url for listing in listings],
+            ["/blog/", "/blog/page/2/", "/blog/page/3/", "/blog/tags/old-forest/", "/blog/tags/x/", "/blog/tags/x/page/2/"],
+        )
+        # newest first, ties by title, undated last
+        self.assertEqual(self.urls(listings[0]), ["/blog/b/", "/blog/e/"])
+        self.assertEqual(self.urls(listings[1]), ["/blog/c/", "/blog/a/"])
+        self.assertEqual(self.urls(listings[2]), ["/blog/d/"])
+        self.assertEqual(self.urls(listings[4]), ["/blog/b/", "/blog/e/"])
+        self.assertEqual(listings[3].title, "Posts tagged Old Forest")
+
+    def test_empty_section(self):
+        listings = plan_listings(self.index(), ["news"])
+        self.assertEqual([(listing.url, listing.posts) for listing in listings], [("/news/", [])])
+
+    def test_listing_node(self):
+        listing = plan_listings(self.index(), ["blog"], page_size=2)[1]
+        self.assertEqual(
+            listing_node(listing).to_html(),
+            '<div><h1>Blog</h1><ul>'
+            '<li><a href="/blog/c/">Post c</a> <time>2024-02-01</time></li>'
+            '<li><a href="/blog/a/">Post a</a> <time>2024-01-01</time></li>'
+            '</ul><nav><a href="/blog/">Newer posts</a><a href="/blog/page/3/">Older posts</a></nav></div>',
+        )
+
+    def test_slugify(self):
+        self.assertEqual(slugify("Old Forest!"), "old-forest")
+        self.assertEqual(slugify("C++ & Rust"), "c-rust")
+
+    def test_only_affected_pages_are_rendered(self):
+        manifest = BuildManifest(self.manifest_path)
+        results = generate_listings(self.index(), ["blog"], self.template, self.public, "/", manifest, page_size=2)
+        self.assertEqual(len(results), 6)
+        manifest.save()
+
+        # retitling c only changes the one archive page it is listed on
+        self.write(os.path.join(self.content, "blog", "c", "index.md"), "---\ndate: 2024-02-01\n---\n# Post C")
+        manifest = BuildManifest.load(self.manifest_path)
+        results = generate_listings(self.index(), ["blog"], self.template, self.public, "/", manifest, page_size=2)
+        self.assertEqual(len(results), 6)
+        self.assertEqual([url for url, result in results if result["output"] == "written"], ["/blog/page/2/"])
+        with open(os.path.join(self.public, "blog", "page", "2", "index.html")) as f:
+            self.assertIn("Post C", f.read())
+
+    def test_hand_written_page_wins(self):
+        self.write(os.path.join(self.content, "blog", "index.md"), "# My blog")
+        results = generate_listings(self.index(), ["blog"], self.template, self.public, "/", page_size=2)
+        self.assertNotIn("/blog/", [url for url, _ in results])
+        self.assertIn("/blog/page/2/", [url for url, _ in results])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from main import parse_args, render_file
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# modules that only the build needs; render-file and --help must not load them
+HEAVY_MODULES = ["generate_content", "concurrent.futures", "multiprocessing", "block_cache", "http.server"]
+
+
+def imported_modules(argv):
+    code = (
+        "import sys\n"
+        f"sys.path.insert(0, {SRC_DIR!r})\n"
+        "import main\n"
+        f"main.parse_args({argv!r})\n"
+        "print('\\n'.join(sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+class TestParseArgs(unittest.TestCase):
+    def test_bare_basepath_builds(self):
+        args = parse_args(["/static-site-gen/", "--incremental"])
+        self.assertEqual((args.command, args.basepath, args.incremental), ("build", "/static-site-gen/", True))
+
+    def test_no_arguments_builds(self):
+        args = parse_args([])
+        self.assertEqual((args.command, args.basepath), ("build", "/"))
+
+    def test_subcommands(self):
+        self.assertEqual(parse_args(["render-file", "a.md"]).path, "a.md")
+        self.assertEqual(parse_args(["serve", "--watch"]).watch, True)
+        self.assertEqual(parse_args(["check-links", "--jobs", "2"]).jobs, 2)
+
+
+class TestStartup(unittest.TestCase):
+    def test_render_file_imports_stay_light(self):
+        modules = imported_modules(["render-file", "a.md"])
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, modules)
+
+    def test_build_imports_are_deferred(self):
+        self.assertNotIn("generate_content", imported_modules(["build"]))
+
+
+class TestRenderFile(unittest.TestCase):
+    def test_output(self):
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "index.md")
+            template = os.path.join(root, "template.html")
+            output = os.path.join(root, "out", "index.html")
+            with open(source, "w") as f:
+                f.write("# Hi\n\n[home](/)")
+            with open(template, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            self.assertEqual(render_file(source, template, "/docs/", output), "written")
+            self.assertEqual(render_file(source, template, "/docs/", output), "skipped")
+            with open(output) as f:
+                self.assertEqual(
+                    f.read(), '<title>Hi</title><div><h1>Hi</h1><p><a href="/docs/">home</a></p></div>'
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from generate_content import copy_files_recursive, generate_pages_recursive
+from manifest import BuildManifest
+
+
+class TestBuildManifest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "public")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(self.static)
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nhello")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nposts")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+
+    def build(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        copy_files_recursive(self.static, self.public, manifest)
+        generate_pages_recursive(self.content, self.template, self.public, "/", manifest)
+        manifest.prune()
+        manifest.save()
+        return manifest
+
+    def test_unchanged_page_is_current(self):
+        self.build()
+        manifest = BuildManifest.load(self.manifest_path)
+        from_path = os.path.join(self.content, "index.md")
+        dest_path = os.path.join(self.public, "index.html")
+        entry = manifest.page_entry(from_path, self.template, dest_path, "/")
+        self.assertTrue(manifest.page_is_current(from_path, entry))
+
+    def test_current_pages_are_reported_as_skipped(self):
+        self.build()
+        manifest = BuildManifest.load(self.manifest_path)
+        results = generate_pages_recursive(self.content, self.template, self.public, "/", manifest)
+        self.assertEqual([result["output"] for _, result in results], ["skipped", "skipped"])
+
+    def test_fresh_manifest_reuses_asset_hashes(self):
+        self.build()
+        from_path = os.path.join(self.static, "index.css")
+        manifest = BuildManifest.load(self.manifest_path)
+        manifest.assets[from_path]["hash"] = "cached"
+        manifest.new_assets = manifest.assets
+        manifest.save()
+        fresh = BuildManifest.fresh(self.manifest_path)
+        self.assertEqual((fresh.pages, fresh.assets), ({}, {}))
+        self.assertEqual(fresh.asset_hash(from_path), "cached")
+        os.utime(from_path, ns=(1, 1))
+        self.assertNotEqual(BuildManifest.fresh(self.manifest_path).asset_hash(from_path), "cached")
+
+    def test_changed_inputs_are_not_current(self):
+        self.build()
+        manifest = BuildManifest.load(self.manifest_path)
+        from_path = os.path.join(self.content, "index.md")
+        dest_path = os.path.join(self.public, "index.html")
+        entry = manifest.page_entry(from_path, self.template, dest_path, "/other/")
+        self.assertFalse(manifest.page_is_current(from_path, entry))
+
+        self.write(from_path, "# Home\n\nchanged")
+        entry = manifest.page_entry(from_path, self.template, dest_path, "/")
+        self.assertFalse(manifest.page_is_current(from_path, entry))
+
+    def test_only_changed_page_is_rewritten(self):
+        self.build()
+        blog_out = os.path.join(self.public, "blog", "index.html")
+        home_out = os.path.join(self.public, "index.html")
+        os.utime(blog_out, (0, 0))
+        os.utime(home_out, (0, 0))
+
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nchanged")
+        self.build()
+        self.assertEqual(os.path.getmtime(blog_out), 0)
+        self.assertNotEqual(os.path.getmtime(home_out), 0)
+        with open(home_out) as f:
+            self.assertIn("changed", f.read())
+
+    def test_removed_source_deletes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        os.remove(os.path.join(self.static, "index.css"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.css")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_missing_output_is_regenerated(self):
+        self.build()
+        os.remove(os.path.join(self.public, "index.html"))
+        self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_prune_untracked(self):
+        self.build()
+        for path in ["stray.txt", os.path.join("old", "index.html"), "index.html.gz", "stray.txt.gz"]:
+            os.makedirs(os.path.dirname(os.path.join(self.public, path)), exist_ok=True)
+            self.write(os.path.join(self.public, path), "x")
+        manifest = BuildManifest(self.manifest_path)
+        copy_files_recursive(self.static, self.public, manifest)
+        generate_pages_recursive(self.content, self.template, self.public, "/", manifest)
+        removed = manifest.prune_untracked(self.public, keep_compressed=True)
+        self.assertEqual(
+            sorted(os.path.relpath(path, self.public) for path in removed),
+            [os.path.join("old", "index.html"), "stray.txt", "stray.txt.gz"],
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.public, "old")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html.gz")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "blog", "index.html")))
+
+    def test_compressed_siblings_are_pruned_without_precompress(self):
+        self.build()
+        sibling = os.path.join(self.public, "index.html.gz")
+        self.write(sibling, "x")
+        manifest = BuildManifest.load(self.manifest_path)
+        copy_files_recursive(self.static, self.public, manifest)
+        generate_pages_recursive(self.content, self.template, self.public, "/", manifest)
+        self.assertEqual(manifest.prune(keep_compressed=True), [])
+        self.assertTrue(os.path.exists(sibling))
+        self.assertEqual(manifest.prune(), [sibling])
+        self.assertFalse(os.path.exists(sibling))
+
+
+if __name__ == "__main__":
+    unittest.main()
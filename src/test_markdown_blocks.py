@@ -1,5 +1,13 @@
+import io
+import os
+import random
+import tempfile
 import unittest
 from markdown_blocks import (
+    file_lines,
+    iter_block_lines,
+    markdown_file_to_html_node,
+    markdown_lines_to_page,
     markdown_to_blocks,
     BlockType,
     block_to_block_type,
@@ -160,4 +168,64 @@ the **same** even with inline stuff
         self.assertEqual(
             html,
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
-        )
\ No newline at end of file
+        )
+
+
+class TestStreamingBlocks(unittest.TestCase):
+    def split_blocks(self, markdown):
+        blocks = []
+        for block in markdown.split("\n\n"):
+            if block == "":
+                continue
+            blocks.append(block.strip())
+        return blocks
+
+    def test_matches_split_on_blank_lines(self):
+        pieces = ["a", "b c", " ", "\t", "\n", "\n", "\n\n", "- x"]
+        rng = random.Random(7)
+        for _ in range(5000):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 14)))
+            self.assertEqual(markdown_to_blocks(text), self.split_blocks(text), repr(text))
+
+    def test_file_lines_match_split(self):
+        for text in ["", "\n", "a", "a\n", "a\n\nb\n\n\n"]:
+            self.assertEqual(list(file_lines(io.StringIO(text))), text.split("\n"))
+
+    def test_block_lines(self):
+        lines = "# Title\n\n  para one\nline two  \n\n\n- a\n- b".split("\n")
+        self.assertEqual(
+            list(iter_block_lines(lines)),
+            [["# Title"], ["para one", "line two"], ["- a", "- b"]],
+        )
+
+    def test_markdown_file_to_html_node(self):
+        md = "Intro\n\n# The Title\n\nSome **bold** text\n\n```\n# not a title\n```\n"
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "index.md")
+            with open(path, "w") as f:
+                f.write(md)
+            node, title = markdown_file_to_html_node(path)
+        self.assertEqual(title, "The Title")
+        self.assertEqual(node.to_html(), markdown_to_html_node(md).to_html())
+
+    def test_markdown_file_without_title(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "index.md")
+            with open(path, "w") as f:
+                f.write("no title here")
+            with self.assertRaises(ValueError):
+                markdown_file_to_html_node(path)
+
+    def test_front_matter_is_not_rendered(self):
+        page = markdown_lines_to_page(["---", "title: From Front Matter", "tags: [a]", "---", "", "body"])
+        node, title, metadata = page
+        self.assertEqual(node.to_html(), "<div><p>body</p></div>")
+        self.assertEqual((title, metadata["tags"]), ("From Front Matter", ["a"]))
+
+    def test_front_matter_without_title_uses_heading(self):
+        node, title, metadata = markdown_lines_to_page(["---", "draft: true", "---", "# Heading"])
+        self.assertEqual((title, metadata), ("Heading", {"draft": True}))
+
+    def test_empty_front_matter_title_uses_heading(self):
+        node, title, metadata = markdown_lines_to_page(["---", "title:", "---", "# Heading"])
+        self.assertEqual((title, metadata), ("Heading", {}))
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from output import atomic_write, stream_if_changed, write_if_changed
+
+
+class TestWriteIfChanged(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "blog", "index.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_creates_directories(self):
+        self.assertEqual(write_if_changed(self.path, "<p>hi</p>"), "written")
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "<p>hi</p>")
+
+    def test_identical_content_is_skipped(self):
+        write_if_changed(self.path, "<p>hi</p>")
+        os.utime(self.path, ns=(1, 1))
+        self.assertEqual(write_if_changed(self.path, "<p>hi</p>"), "skipped")
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 1)
+
+    def test_changed_content_is_replaced(self):
+        write_if_changed(self.path, "<p>hi</p>")
+        with open(self.path) as reader:
+            self.assertEqual(write_if_changed(self.path, "<p>ho</p>"), "written")
+            self.assertEqual(write_if_changed(self.path, "<p>hi!</p>"), "written")
+            # replaced by rename, so a reader that opened it earlier still sees the old file
+            self.assertEqual(reader.read(), "<p>hi</p>")
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "<p>hi!</p>")
+
+    def test_streamed_content_is_compared(self):
+        self.assertEqual(stream_if_changed(self.path, lambda f: f.write("<p>hi</p>")), "written")
+        os.utime(self.path, ns=(1, 1))
+        self.assertEqual(stream_if_changed(self.path, lambda f: f.write("<p>hi</p>")), "skipped")
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 1)
+        self.assertEqual(stream_if_changed(self.path, lambda f: f.write("<p>ho</p>")), "written")
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "<p>ho</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["index.html"])
+
+    def test_failed_write_leaves_old_file(self):
+        atomic_write(self.path, b"old")
+        with self.assertRaises(TypeError):
+            atomic_write(self.path, "not bytes")
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "old")
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["index.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
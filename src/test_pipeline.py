@@ -0,0 +1,64 @@
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from generate_content import discover_pages, generate_pages_recursive
+from pipeline import generate_pages_pipelined
+
+
+class TestPipeline(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        for i in range(12):
+            os.makedirs(os.path.join(self.content, f"p{i}"))
+            self.write(
+                os.path.join(self.content, f"p{i}", "index.md"),
+                f"# Page {i}\n\n[home](/) and **bold {i}**\n\n- one\n- two",
+            )
+
+    def pages(self):
+        return [
+            (from_path, self.template, dest_path)
+            for from_path, dest_path in discover_pages(self.content, self.public)
+        ]
+
+    def read_outputs(self):
+        outputs = {}
+        for _, _, dest_path in self.pages():
+            with open(dest_path) as f:
+                outputs[dest_path] = f.read()
+        return outputs
+
+    def test_matches_sequential(self):
+        generate_pages_recursive(self.content, self.template, self.public, "/docs/")
+        sequential = self.read_outputs()
+        generate_pages_recursive(self.content, self.template, self.public, "/docs/", io_threads=2)
+        self.assertEqual(self.read_outputs(), sequential)
+        self.assertIn('<a href="/docs/">home</a>', sequential[os.path.join(self.public, "p3", "index.html")])
+
+    def test_small_queues(self):
+        results, failures = generate_pages_pipelined(self.pages(), "/", io_threads=1, queue_size=1)
+        self.assertEqual(failures, [])
+        self.assertEqual(len(results), 12)
+        self.assertEqual(len(self.read_outputs()), 12)
+
+    def test_failures_are_collected(self):
+        self.write(os.path.join(self.content, "p2", "index.md"), "no title")
+        os.remove(os.path.join(self.content, "p5", "index.md"))
+        pages = self.pages()
+        pages.append((os.path.join(self.content, "p5", "index.md"), self.template, os.path.join(self.public, "p5", "index.html")))
+        results, failures = generate_pages_pipelined(pages, "/", io_threads=2, queue_size=2)
+        self.assertEqual(
+            sorted(from_path for from_path, _ in failures),
+            [os.path.join(self.content, "p2", "index.md"), os.path.join(self.content, "p5", "index.md")],
+        )
+        self.assertIsInstance(dict(failures)[os.path.join(self.content, "p5", "index.md")], FileNotFoundError)
+        self.assertEqual(len(results), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
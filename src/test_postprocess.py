@@ -0,0 +1,85 @@
+import gzip
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from postprocess import discover_outputs, minify_html, postprocess_outputs
+
+
+class TestMinifyHtml(unittest.TestCase):
+    def test_collapses_whitespace(self):
+        html = "<html>\n  <body>\n    <p>a  <b>b</b>\n  c</p>\n  </body>\n</html>\n"
+        self.assertEqual(minify_html(html), "<html> <body> <p>a <b>b</b> c</p> </body> </html>")
+
+    def test_keeps_non_breaking_spaces(self):
+        self.assertEqual(minify_html("<p>10\xa0km \n\u2009apart</p>"), "<p>10\xa0km \u2009apart</p>")
+
+    def test_removes_comments(self):
+        self.assertEqual(minify_html("<p>a</p><!-- note --><p>b</p>"), "<p>a</p><p>b</p>")
+
+    def test_keeps_conditional_comments(self):
+        html = "<!--[if IE]><p>old</p><![endif]-->"
+        self.assertEqual(minify_html(html), html)
+
+    def test_preserves_pre(self):
+        html = "<div>\n  <pre><code>x  =  1\n    y\n</code></pre>\n</div>"
+        self.assertEqual(minify_html(html), "<div> <pre><code>x  =  1\n    y\n</code></pre> </div>")
+
+    def test_keeps_attributes(self):
+        html = '<img src="/a.png" alt="two  spaces">'
+        self.assertEqual(minify_html(html), html)
+
+
+class TestPostprocessOutputs(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = self.tmp.name
+        self.page = os.path.join(self.root, "blog", "index.html")
+        self.css = os.path.join(self.root, "index.css")
+        self.write(self.page, "<html>\n  <body>\n    <p>hello</p>\n  </body>\n</html>\n")
+        self.write(self.css, "body { color: red; }\n")
+        self.write(os.path.join(self.root, "images", "a.png"), "png")
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_discover_outputs(self):
+        self.assertEqual(discover_outputs(self.root), [self.css, self.page])
+
+    def test_precompress(self):
+        stats = postprocess_outputs(self.root)
+        self.assertEqual(stats.compressed, 2)
+        with gzip.open(self.page + ".gz", "rt") as f:
+            self.assertEqual(f.read(), self.read(self.page))
+        with gzip.open(self.css + ".gz", "rt") as f:
+            self.assertEqual(f.read(), self.read(self.css))
+        self.assertFalse(os.path.exists(os.path.join(self.root, "images", "a.png.gz")))
+
+    def test_unchanged_outputs_are_skipped(self):
+        postprocess_outputs(self.root)
+        with open(self.page + ".gz", "rb") as f:
+            before = f.read()
+        stats = postprocess_outputs(self.root)
+        self.assertEqual((stats.compressed, stats.skipped), (0, 2))
+
+        self.write(self.page, "<p>changed</p>")
+        os.utime(self.page, ns=(os.stat(self.page + ".gz").st_mtime_ns + 1,) * 2)
+        stats = postprocess_outputs(self.root)
+        self.assertEqual((stats.compressed, stats.skipped), (1, 1))
+        with open(self.page + ".gz", "rb") as f:
+            self.assertNotEqual(f.read(), before)
+
+    def test_output_older_than_its_siblings_is_compressed(self):
+        postprocess_outputs(self.root)
+        # an output replaced by a copy that keeps an older mtime
+        self.write(self.page, "<p>restored</p>")
+        os.utime(self.page, ns=(0, 0))
+        stats = postprocess_outputs(self.root)
+        self.assertEqual((stats.compressed, stats.skipped), (1, 1))
+        with gzip.open(self.page + ".gz", "rt") as f:
+            self.assertEqual(f.read(), "<p>restored</p>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import io
+import json
+import unittest
+
+from block_cache import BlockCache
+from markdown_blocks import markdown_to_html_node
+from search_index import SearchIndex, collect_text, decode_postings, page_terms
+
+
+class TestCollectText(unittest.TestCase):
+    def test_collects_inline_text(self):
+        with collect_text() as texts:
+            markdown_to_html_node("# Tom Bombadil\n\nOld **Tom** sings [songs](/songs)\n\n```\nnot indexed\n```")
+        self.assertEqual(page_terms(" ".join(texts)), ["bombadil", "old", "sings", "songs", "tom"])
+
+    def test_inactive_outside_context(self):
+        with collect_text() as texts:
+            pass
+        markdown_to_html_node("words")
+        self.assertEqual(texts, [])
+
+    def test_cache_hits_still_collect(self):
+        cache = BlockCache()
+        markdown_to_html_node("Shared _footer_", cache)
+        with collect_text() as texts:
+            markdown_to_html_node("Shared _footer_", cache)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(page_terms(*texts), ["footer", "shared"])
+
+
+class TestPageTerms(unittest.TestCase):
+    def test_lowercased_unique_and_sorted(self):
+        self.assertEqual(page_terms("The Elves, the ELVES!", "a x_y 42"), ["42", "elves", "the"])
+
+
+class TestSearchIndex(unittest.TestCase):
+    def test_postings_are_gap_encoded(self):
+        index = SearchIndex()
+        index.add("/", "Home", ["tolkien"])
+        index.add("/a/", "A", ["ring"])
+        index.add("/b/", "B", ["ring", "tolkien"])
+        data = index.to_dict()
+        self.assertEqual(data["pages"], [["/", "Home"], ["/a/", "A"], ["/b/", "B"]])
+        self.assertEqual(data["terms"], {"ring": [1, 1], "tolkien": [0, 2]})
+        self.assertEqual(decode_postings(data["terms"]["tolkien"]), [0, 2])
+
+    def test_write_is_compact_json(self):
+        index = SearchIndex()
+        index.add("/", "Home", ["ring"])
+        sink = io.StringIO()
+        index.write(sink)
+        self.assertNotIn(" ", sink.getvalue())
+        self.assertEqual(json.loads(sink.getvalue())["terms"], {"ring": [0]})
+
+
+if __name__ == "__main__":
+    unittest.main()
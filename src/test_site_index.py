@@ -0,0 +1,141 @@
+import os
+import unittest
+
+import site_index
+from fixtures import TempDirTestCase
+from metadata import MetadataStore
+from site_index import SiteIndex, normalize_url, output_url, scan_references
+
+
+class TestScanReferences(unittest.TestCase):
+    def test_lines(self):
+        links, images = scan_references(
+            "# Title\n\nsee [a](/a) and [b](https://b.example)\n\n![pic](/images/p.png)".split("\n")
+        )
+        self.assertEqual(links, [("/a", 3), ("https://b.example", 3)])
+        self.assertEqual(images, [("/images/p.png", 5)])
+
+    def test_code_is_skipped(self):
+        links, images = scan_references("```\n[a](/a)\n![b](/b.png)\n```\n\n[c](/c)".split("\n"))
+        self.assertEqual(links, [("/c", 6)])
+        self.assertEqual(images, [])
+
+    def test_inline_code_is_skipped(self):
+        links, _ = scan_references(["Use `[text](/nope)` syntax, then [text](/nope) again"])
+        self.assertEqual(links, [("/nope", 1)])
+
+    def test_lines_within_blocks(self):
+        links, images = scan_references(
+            "## Head [h](/h)\n\n  first line\nsecond **[b](/b)**\n\n- a\n- [l](/l)\n\n> q\n> ![i](/i.png)".split("\n")
+        )
+        # the renderer keeps bold text as it is, so [b](/b) is no link
+        self.assertEqual(links, [("/h", 1), ("/l", 7)])
+        self.assertEqual(images, [("/i.png", 10)])
+
+    def test_unparsable_blocks_are_skipped(self):
+        links, _ = scan_references("**open [a](/a)\n\n[b](/b)".split("\n"))
+        self.assertEqual(links, [("/b", 3)])
+
+
+class TestUrls(unittest.TestCase):
+    def test_output_url(self):
+        self.assertEqual(output_url(os.path.join("docs", "index.html"), "docs"), "/")
+        self.assertEqual(output_url(os.path.join("docs", "blog", "tom", "index.html"), "docs"), "/blog/tom/")
+
+    def test_normalize_url(self):
+        self.assertEqual(normalize_url("/blog/tom"), "/blog/tom/")
+        self.assertEqual(normalize_url("/blog/tom/index.html#top"), "/blog/tom/")
+        self.assertEqual(normalize_url("/"), "/")
+        self.assertIsNone(normalize_url("https://example.com/"))
+        self.assertIsNone(normalize_url("//cdn.example.com/x"))
+        self.assertIsNone(normalize_url("#top"))
+
+
+class TestSiteIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.write(self.template, "{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[blog](/blog) [ext](https://x.example)")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\n[home](/) [post](/blog/post/)")
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "no title\n\n[blog](/blog/)")
+
+    def test_build(self):
+        index = SiteIndex.build(self.content, self.public, self.template)
+        self.assertEqual(len(index), 3)
+        blog = index.page_for_url("/blog")
+        self.assertEqual(blog.title, "Blog")
+        self.assertEqual(blog.dest, os.path.join(self.public, "blog", "index.html"))
+        self.assertEqual(blog.template, self.template)
+        self.assertIsNone(index.page_for_url("/blog/post/").title)
+        self.assertEqual(
+            index.render_list(),
+            [(page.source, self.template, page.dest) for page in index],
+        )
+
+    def test_link_graph(self):
+        index = SiteIndex.build(self.content, self.public, self.template)
+        home = os.path.join(self.content, "index.md")
+        blog = os.path.join(self.content, "blog", "index.md")
+        post = os.path.join(self.content, "blog", "post", "index.md")
+        self.assertEqual([page.source for page in index.outbound(blog)], [home, post])
+        self.assertEqual(index.linked_from("/blog/"), [post, home])
+        self.assertEqual(index.linked_from("/nowhere"), [])
+
+    def test_front_matter(self):
+        self.write(
+            os.path.join(self.content, "blog", "post", "index.md"),
+            "---\ntitle: Post\ntags: [a]\ntemplate: post\n---\n\n[blog](/blog/)",
+        )
+        self.write(os.path.join(self.content, "draft", "index.md"), "---\ndraft: true\n---\n# Draft")
+        templates = os.path.join(self.tmp.name, "templates")
+        index = SiteIndex.build(self.content, self.public, self.template, templates)
+        post = index.page_for_url("/blog/post/")
+        self.assertEqual((post.title, post.metadata["tags"]), ("Post", ["a"]))
+        self.assertEqual(post.template, os.path.join(templates, "post.html"))
+        # line numbers count the front matter
+        self.assertEqual(post.links, [("/blog/", 7)])
+        self.assertIsNone(index.page_for_url("/draft/"))
+
+        index = SiteIndex.build(self.content, self.public, self.template, include_drafts=True)
+        self.assertTrue(index.page_for_url("/draft/").draft)
+
+    def test_crlf_sources(self):
+        self.write(os.path.join(self.content, "index.md"), b"# Home\r\n\r\n[blog](/blog)\r\n")
+        self.write(os.path.join(self.content, "blog", "index.md"), b"---\r\ntitle: Blog\r\n---\r\n# Heading\r\n")
+        index = SiteIndex.build(self.content, self.public, self.template)
+        self.assertEqual(index.page_for_url("/").title, "Home")
+        self.assertEqual(index.page_for_url("/").links, [("/blog", 3)])
+        self.assertEqual(index.page_for_url("/blog/").title, "Blog")
+
+    def test_metadata_store_skips_unchanged_sources(self):
+        store_path = os.path.join(self.tmp.name, "metadata.json")
+        store = MetadataStore.load(store_path)
+        first = SiteIndex.build(self.content, self.public, self.template, store=store)
+        store.save()
+
+        home = os.path.join(self.content, "index.md")
+        self.write(home, "# New home")
+        scanned = []
+        original = site_index.scan_page
+
+        def counting_scan(from_path):
+            scanned.append(from_path)
+            return original(from_path)
+
+        site_index.scan_page = counting_scan
+        try:
+            second = SiteIndex.build(self.content, self.public, self.template, store=MetadataStore.load(store_path))
+        finally:
+            site_index.scan_page = original
+        self.assertEqual(scanned, [home])
+        self.assertEqual(second.page(home).title, "New home")
+        blog = os.path.join(self.content, "blog", "index.md")
+        self.assertEqual(second.page(blog).links, first.page(blog).links)
+        self.assertEqual(second.page(blog).hash, first.page(blog).hash)
+
+
+if __name__ == "__main__":
+    unittest.main()
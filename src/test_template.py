@@ -0,0 +1,85 @@
+import io
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from htmlnode import LeafNode, ParentNode
+from template import Template, load_template, select_template
+
+
+class TestTemplate(unittest.TestCase):
+    def render(self, template, values):
+        sink = io.StringIO()
+        template.render(sink, values)
+        return sink.getvalue()
+
+    def test_compiles_to_slots(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.assertEqual(template.slots, ["Title", "Content"])
+        self.assertEqual(template.parts[0], "<title>")
+
+    def test_render_strings_and_nodes(self):
+        template = Template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+        node = ParentNode("p", [LeafNode("b", "hi")])
+        html = self.render(template, {"Title": "Home", "Content": node})
+        self.assertEqual(html, "<title>Home</title><article><p><b>hi</b></p></article>")
+
+    def test_repeated_slot(self):
+        template = Template("{{ Title }} - {{ Title }}")
+        self.assertEqual(self.render(template, {"Title": "x"}), "x - x")
+
+    def test_unknown_slot_is_kept(self):
+        template = Template("{{ Title }} {{ Footer }}")
+        self.assertEqual(self.render(template, {"Title": "x"}), "x {{ Footer }}")
+
+    def test_value_is_not_rescanned(self):
+        template = Template("{{ Title }}|{{ Content }}")
+        html = self.render(template, {"Title": "{{ Content }}", "Content": "body"})
+        self.assertEqual(html, "{{ Content }}|body")
+
+    def test_with_basepath_rewrites_literal_attributes(self):
+        template = Template('<link href="/index.css" /><a href="//cdn.example.com/x">{{ Content }}</a><img src="/a.png">')
+        rebased = template.with_basepath("/site/")
+        html = self.render(rebased, {"Content": 'href="/keep'})
+        self.assertEqual(html, '<link href="/site/index.css" /><a href="//cdn.example.com/x">href="/keep</a><img src="/site/a.png">')
+        self.assertIs(template.with_basepath("/site/"), rebased)
+        self.assertIs(template.with_basepath("/"), template)
+
+
+class TestLoadTemplate(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = self.tmp.name
+
+    def test_load_is_cached_until_modified(self):
+        path = os.path.join(self.root, "template.html")
+        self.write(path, "a {{ Content }}")
+        first = load_template(path)
+        self.assertIs(load_template(path), first)
+
+        self.write(path, "b {{ Content }}")
+        os.utime(path, ns=(0, 0))
+        second = load_template(path)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.parts[0], "b ")
+
+    def test_select_template_by_section(self):
+        content = os.path.join(self.root, "content")
+        templates = os.path.join(self.root, "templates")
+        default = os.path.join(self.root, "template.html")
+        self.write(os.path.join(templates, "blog.html"), "{{ Content }}")
+
+        blog_page = os.path.join(content, "blog", "tom", "index.md")
+        contact_page = os.path.join(content, "contact", "index.md")
+        home_page = os.path.join(content, "index.md")
+        self.assertEqual(
+            select_template(blog_page, content, default, templates),
+            os.path.join(templates, "blog.html"),
+        )
+        self.assertEqual(select_template(contact_page, content, default, templates), default)
+        self.assertEqual(select_template(home_page, content, default, templates), default)
+        self.assertEqual(select_template(blog_page, content, default), default)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,18 @@
 import unittest
 
-from textnode import TextNode, TextType, split_nodes_delimiter, extract_markdown_images, extract_markdown_links
+from textnode import (
+    LINK_INLINE,
+    InlinePattern,
+    TextNode,
+    TextType,
+    extract_markdown_images,
+    extract_markdown_links,
+    register_inline_pattern,
+    split_nodes_delimiter,
+    split_nodes_pattern,
+    text_to_textnodes,
+    unregister_inline_pattern,
+)
 
 class TestTextNode(unittest.TestCase):
     def test_eq(self):
@@ -18,6 +30,10 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a text node with different text type", TextType.ITALIC)
         self.assertNotEqual(node, node2)
 
+    def test_no_instance_dict(self):
+        node = TextNode("This is a text node", TextType.BOLD)
+        self.assertFalse(hasattr(node, "__dict__"))
+
     def test_url_eq_none(self):
         node = TextNode("This is a text node", TextType.BOLD)
         self.assertEqual(node.url, None)
@@ -327,5 +343,108 @@ class TestTextNode(unittest.TestCase):
         ]
         self.assertEqual(result, expected)
 
+    def test_text_to_textnodes_underscore_in_image_breaks_it(self):
+        from textnode import text_to_textnodes
+        result = text_to_textnodes("![a_b_c](url)")
+        expected = [
+            TextNode("![a", TextType.TEXT),
+            TextNode("b", TextType.ITALIC),
+            TextNode("c](url)", TextType.TEXT),
+        ]
+        self.assertEqual(result, expected)
+
+    def test_text_to_textnodes_underscore_inside_code_raises(self):
+        from textnode import text_to_textnodes
+        with self.assertRaises(ValueError):
+            text_to_textnodes("`a_b`")
+
+    def test_text_to_textnodes_reports_the_first_pass_error(self):
+        from textnode import text_to_textnodes
+        with self.assertRaisesRegex(ValueError, r"Unmatched '\*\*' in text '!\[x\]\(y\)_\*\*'"):
+            text_to_textnodes("![x](y)_**")
+        # "_" is checked in every piece before "`" is checked in any
+        with self.assertRaisesRegex(ValueError, r"Unmatched '_' in text 'c_'"):
+            text_to_textnodes("a`b**x**c_")
+
+    def test_text_to_textnodes_matches_split_pipeline(self):
+        import random
+        from textnode import split_nodes_image, split_nodes_link, text_to_textnodes
+
+        def split_pipeline(text):
+            nodes = [TextNode(text, TextType.TEXT)]
+            nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+            nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+            nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+            nodes = split_nodes_image(nodes)
+            nodes = split_nodes_link(nodes)
+            return nodes
+
+        def outcome(convert, text):
+            try:
+                return convert(text)
+            except ValueError as e:
+                return str(e)
+
+        pieces = ["a", " ", "*", "**", "_", "`", "!", "[", "]", "(", ")",
+                  "![x](y)", "[l](u)", "**b**", "_i_", "`c`"]
+        rng = random.Random(42)
+        for _ in range(5000):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            self.assertEqual(outcome(text_to_textnodes, text), outcome(split_pipeline, text), text)
+
+class TestInlinePatterns(unittest.TestCase):
+    def tearDown(self):
+        unregister_inline_pattern("strikethrough")
+
+    def strikethrough(self):
+        return InlinePattern("strikethrough", r"~~([^~]+)~~", lambda text: TextNode(text, TextType.TEXT, "del"))
+
+    def test_register_pattern(self):
+        register_inline_pattern(self.strikethrough())
+        self.assertEqual(
+            text_to_textnodes("a ~~gone~~ and [l](u) **b**"),
+            [
+                TextNode("a ", TextType.TEXT),
+                TextNode("gone", TextType.TEXT, "del"),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("l", TextType.LINK, "u"),
+                TextNode(" ", TextType.TEXT),
+                TextNode("b", TextType.BOLD),
+            ],
+        )
+
+    def test_unregister_pattern(self):
+        register_inline_pattern(self.strikethrough())
+        unregister_inline_pattern("strikethrough")
+        self.assertEqual(text_to_textnodes("~~x~~"), [TextNode("~~x~~", TextType.TEXT)])
+
+    def test_duplicate_name(self):
+        register_inline_pattern(self.strikethrough())
+        with self.assertRaises(ValueError):
+            register_inline_pattern(self.strikethrough())
+
+    def test_before(self):
+        # ahead of links, the whole bracketed text is one span
+        pattern = InlinePattern("strikethrough", r"\[~([^\]]*)~\]\(([^)]*)\)", lambda text, url: TextNode(text, TextType.TEXT, url))
+        register_inline_pattern(pattern, before="link")
+        self.assertEqual(text_to_textnodes("[~x~](u)"), [TextNode("x", TextType.TEXT, "u")])
+
+    def test_split_nodes_pattern(self):
+        nodes = split_nodes_pattern(
+            [TextNode("x [a](b) y [c](d)", TextType.TEXT), TextNode("[e](f)", TextType.BOLD)],
+            LINK_INLINE,
+        )
+        self.assertEqual(
+            nodes,
+            [
+                TextNode("x ", TextType.TEXT),
+                TextNode("a", TextType.LINK, "b"),
+                TextNode(" y ", TextType.TEXT),
+                TextNode("c", TextType.LINK, "d"),
+                TextNode("[e](f)", TextType.BOLD),
+            ],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+import unittest
+
+from generate_content import generate_pages_recursive
+from timing import BuildReport, PhaseTimer, activate, timed
+
+
+class TestPhaseTimer(unittest.TestCase):
+    def test_nested_phases_are_exclusive(self):
+        timer = PhaseTimer()
+        with timer.phase("outer"):
+            with timer.phase("inner"):
+                pass
+        self.assertEqual(set(timer.totals), {"outer", "inner"})
+        self.assertGreaterEqual(timer.totals["outer"], 0)
+        self.assertGreaterEqual(timer.totals["inner"], 0)
+
+    def test_timed_only_records_when_active(self):
+        @timed("work")
+        def work():
+            return 42
+
+        self.assertEqual(work(), 42)
+        timer = PhaseTimer()
+        with activate(timer):
+            self.assertEqual(work(), 42)
+        self.assertIn("work", timer.totals)
+        work()
+        self.assertEqual(len(timer.totals), 1)
+
+
+class TestBuildReport(unittest.TestCase):
+    def test_report_from_build(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            os.makedirs(os.path.join(content, "blog"))
+            template = os.path.join(root, "template.html")
+            with open(template, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            with open(os.path.join(content, "index.md"), "w") as f:
+                f.write("# Home\n\nSome **bold** text\n\n- a\n- b")
+            with open(os.path.join(content, "blog", "index.md"), "w") as f:
+                f.write("# Blog")
+
+            report = BuildReport()
+            generate_pages_recursive(content, template, os.path.join(root, "public"), "/", report=report)
+
+            data = report.to_dict()
+            self.assertEqual(set(data["build"]), {"discovery", "pages"})
+            self.assertEqual(len(data["pages"]), 2)
+            for phase in ["template_load", "block_parse", "inline_parse", "serialize", "template", "write"]:
+                self.assertIn(phase, data["page_phases"])
+            self.assertIn("Slowest pages:", report.summary())
+
+            path = os.path.join(root, "timings.json")
+            report.write_json(path)
+            with open(path) as f:
+                self.assertEqual(len(json.load(f)["pages"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
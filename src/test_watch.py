@@ -0,0 +1,116 @@
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from generate_content import generate_pages_recursive
+from watch import SiteWatcher, diff_snapshots
+
+
+class TestDiffSnapshots(unittest.TestCase):
+    def test_changed_added_and_removed(self):
+        old = {"a": (1, 10), "b": (1, 10), "c": (1, 10)}
+        new = {"a": (1, 10), "b": (2, 11), "d": (1, 1)}
+        self.assertEqual(diff_snapshots(old, new), (["b", "d"], ["c"]))
+
+
+class TestSiteWatcher(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.public = os.path.join(root, "public")
+        self.template = os.path.join(root, "template.html")
+        self.templates = os.path.join(root, "templates")
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(self.static)
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        generate_pages_recursive(self.content, self.template, self.public, "/")
+        self.watcher = SiteWatcher(self.content, self.static, self.template, self.public, "/", self.templates)
+
+    def write(self, path, text, mtime=None):
+        super().write(path, text)
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_no_changes(self):
+        self.assertEqual(self.watcher.poll(), [])
+
+    def test_changed_page_only(self):
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog 2", mtime=1)
+        self.assertEqual(self.watcher.poll(), [os.path.join(self.public, "blog", "index.html")])
+        self.assertIn("Blog 2", self.read(os.path.join(self.public, "blog", "index.html")))
+
+    def test_template_change_rerenders_its_pages(self):
+        self.write(self.template, "<h6>{{ Title }}</h6>", mtime=1)
+        outputs = self.watcher.poll()
+        self.assertEqual(len(outputs), 2)
+        self.assertEqual(self.read(os.path.join(self.public, "index.html")), "<h6>Home</h6>")
+
+    def test_new_section_template_is_picked_up(self):
+        self.write(os.path.join(self.templates, "blog.html"), "blog: {{ Title }}")
+        self.assertEqual(self.watcher.poll(), [os.path.join(self.public, "blog", "index.html")])
+        self.assertEqual(self.read(os.path.join(self.public, "blog", "index.html")), "blog: Blog")
+
+    def test_front_matter_template_and_draft(self):
+        blog = os.path.join(self.content, "blog", "index.md")
+        blog_output = os.path.join(self.public, "blog", "index.html")
+        self.write(os.path.join(self.templates, "post.html"), "<article>{{ Content }}</article>")
+        self.write(blog, "---\ntemplate: post\n---\n# Blog", mtime=1)
+        self.assertEqual(self.watcher.poll(), [blog_output])
+        self.assertEqual(self.read(blog_output), "<article><div><h1>Blog</h1></div></article>")
+
+        self.write(blog, "---\ndraft: true\n---\n# Blog", mtime=2)
+        self.assertEqual(self.watcher.poll(), [blog_output])
+        self.assertFalse(os.path.exists(blog_output))
+
+        self.write(blog, "# Blog", mtime=3)
+        self.assertEqual(self.watcher.poll(), [blog_output])
+        self.assertTrue(os.path.exists(blog_output))
+
+    def test_listings_follow_posts(self):
+        watcher = SiteWatcher(self.content, self.static, self.template, self.public, "/", listings=["news"])
+        listing = os.path.join(self.public, "news", "index.html")
+        self.write(os.path.join(self.content, "news", "a", "index.md"), "---\ndate: 2024-01-01\n---\n# First")
+        self.assertIn(listing, watcher.poll())
+        self.assertIn("First", self.read(listing))
+
+        self.write(os.path.join(self.content, "news", "a", "index.md"), "---\ndate: 2024-01-01\n---\n# Renamed", mtime=1)
+        self.assertIn(listing, watcher.poll())
+        self.assertIn("Renamed", self.read(listing))
+        # a static change leaves the listings alone
+        self.write(os.path.join(self.static, "index.css"), "p {}", mtime=2)
+        self.assertNotIn(listing, watcher.poll())
+
+    def test_added_and_removed_pages(self):
+        self.write(os.path.join(self.content, "new", "index.md"), "# New")
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        outputs = self.watcher.poll()
+        self.assertIn(os.path.join(self.public, "new", "index.html"), outputs)
+        self.assertTrue(os.path.exists(os.path.join(self.public, "new", "index.html")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog")))
+
+    def test_static_assets(self):
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+        self.watcher.poll()
+        self.assertEqual(self.read(os.path.join(self.public, "images", "a.png")), "png")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        self.watcher.poll()
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images", "a.png")))
+
+    def test_broken_page_does_not_stop_watching(self):
+        self.write(os.path.join(self.content, "blog", "index.md"), "no title", mtime=1)
+        self.assertEqual(self.watcher.poll(), [])
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Fixed", mtime=2)
+        self.assertEqual(self.watcher.poll(), [os.path.join(self.public, "blog", "index.html")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 from enum import Enum
 import re
 
+from timing import timed
+
 class TextType(Enum):
     TEXT = "text"
     BOLD = "bold"
@@ -10,6 +12,8 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -21,15 +25,111 @@ class TextNode:
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
+class InlinePattern:
+    # An inline syntax matched by `pattern`; `build` receives the pattern's
+    # groups and returns the TextNode that replaces the match.
+    __slots__ = ("name", "regex", "build")
+
+    def __init__(self, name, pattern, build):
+        self.name = name
+        self.regex = re.compile(pattern)
+        self.build = build
+
+    def split(self, text):
+        # (start, end, node) spans of every match, found in a single finditer pass
+        return [(match.start(), match.end(), self.build(*match.groups())) for match in self.regex.finditer(text)]
+
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+IMAGE_INLINE = InlinePattern("image", IMAGE_PATTERN.pattern, lambda alt, url: TextNode(alt, TextType.IMAGE, url))
+LINK_INLINE = InlinePattern("link", LINK_PATTERN.pattern, lambda text, url: TextNode(text, TextType.LINK, url))
+INLINE_PATTERNS = [IMAGE_INLINE, LINK_INLINE]
+
+def register_inline_pattern(pattern, before=None):
+    # Adds new inline syntax. Patterns claim their matches in registration
+    # order (or just ahead of the pattern named by `before`), each in the text
+    # the earlier ones left, as images are matched before links.
+    names = [existing.name for existing in INLINE_PATTERNS]
+    if pattern.name in names:
+        raise ValueError(f"inline pattern already registered: {pattern.name}")
+    index = names.index(before) if before is not None else len(INLINE_PATTERNS)
+    INLINE_PATTERNS.insert(index, pattern)
+
+def unregister_inline_pattern(name):
+    INLINE_PATTERNS[:] = [pattern for pattern in INLINE_PATTERNS if pattern.name != name]
+
+DELIMITER_TYPES = {
+    "**": TextType.BOLD,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+
+DELIMITERS = list(DELIMITER_TYPES.items())
+
+@timed("inline_parse")
 def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    # The same nodes and errors as split_nodes_delimiter for "**", "_" and
+    # "`" followed by split_nodes_image and split_nodes_link, in one walk:
+    # each piece is split on the delimiters it contains and its plain text
+    # is sliced at the pattern matches, rather than re-split per match.
+    if not text:
+        return [TextNode(text, TextType.TEXT)]
+    nodes = []
+    try:
+        add_delimited_nodes(nodes, text, 0, list(INLINE_PATTERNS))
+    except ValueError:
+        # the walk is depth first, so it may meet a later pass's error
+        # first; the passes raise the one split_nodes_delimiter would
+        nodes = [TextNode(text, TextType.TEXT)]
+        for delimiter, text_type in DELIMITERS:
+            nodes = split_nodes_delimiter(nodes, delimiter, text_type)
+        raise
     return nodes
 
+def add_delimited_nodes(nodes, text, level, patterns):
+    while level < len(DELIMITERS) and DELIMITERS[level][0] not in text:
+        level += 1
+    if level == len(DELIMITERS):
+        add_text_nodes(nodes, text, patterns)
+        return
+    delimiter, text_type = DELIMITERS[level]
+    parts = text.split(delimiter)
+    if len(parts) % 2 == 0:
+        raise ValueError(f"Invalid Markdown syntax: Unmatched '{delimiter}' in text '{text}'")
+    is_special = False
+    for part in parts:
+        if part:
+            if is_special:
+                nodes.append(TextNode(part, text_type))
+            else:
+                add_delimited_nodes(nodes, part, level + 1, patterns)
+        is_special = not is_special
+
+def add_text_nodes(nodes, text, patterns):
+    for index, pattern in enumerate(patterns):
+        match = pattern.regex.search(text)
+        if match is not None:
+            add_pattern_nodes(nodes, text, patterns, index, match)
+            return
+    nodes.append(TextNode(text, TextType.TEXT))
+
+def add_pattern_nodes(nodes, text, patterns, index, match):
+    # patterns[index] claims its matches, the first of which is `match`;
+    # the text between them is left to the later patterns
+    pattern = patterns[index]
+    rest = patterns[index + 1:]
+    pos = 0
+    while match is not None:
+        start = match.start()
+        if pos < start:
+            add_text_nodes(nodes, text[pos:start], rest)
+        nodes.append(pattern.build(*match.groups()))
+        pos = match.end()
+        match = pattern.regex.search(text, pos)
+    if pos < len(text):
+        add_text_nodes(nodes, text[pos:], rest)
+
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
     for old_node in old_nodes:
@@ -54,59 +154,35 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
     return new_nodes
 
-def split_nodes_image(old_nodes):
+def split_nodes_pattern(old_nodes, pattern):
     new_nodes = []
     for old_node in old_nodes:
         if old_node.text_type != TextType.TEXT:
             new_nodes.append(old_node)
             continue
-        original_text = old_node.text
-        images = extract_markdown_images(original_text)
-        if len(images) == 0:
+        spans = pattern.split(old_node.text)
+        if not spans:
             new_nodes.append(old_node)
             continue
-        for image in images:
-            sections = original_text.split(f"![{image[0]}]({image[1]})", 1)
-            if len(sections) != 2:
-                raise ValueError("invalid markdown, image section not closed")
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-            new_nodes.append(TextNode(image[0], TextType.IMAGE, image[1]))
-            original_text = sections[1]
-        if original_text != "":
-            new_nodes.append(TextNode(original_text, TextType.TEXT))
+        text = old_node.text
+        pos = 0
+        for start, end, node in spans:
+            if pos < start:
+                new_nodes.append(TextNode(text[pos:start], TextType.TEXT))
+            new_nodes.append(node)
+            pos = end
+        if pos < len(text):
+            new_nodes.append(TextNode(text[pos:], TextType.TEXT))
     return new_nodes
 
+def split_nodes_image(old_nodes):
+    return split_nodes_pattern(old_nodes, IMAGE_INLINE)
+
 def split_nodes_link(old_nodes):
-    new_nodes = []
-    for old_node in old_nodes:
-        if old_node.text_type != TextType.TEXT:
-            new_nodes.append(old_node)
-            continue
-        original_text = old_node.text
-        links = extract_markdown_links(original_text)
-        if len(links) == 0:
-            new_nodes.append(old_node)
-            continue
-        for link in links:
-            sections = original_text.split(f"[{link[0]}]({link[1]})", 1)
-            if len(sections) != 2:
-                raise ValueError("invalid markdown, link section not closed")
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-            new_nodes.append(TextNode(link[0], TextType.LINK, link[1]))
-            original_text = sections[1]
-        if original_text != "":
-            new_nodes.append(TextNode(original_text, TextType.TEXT))
-    return new_nodes
+    return split_nodes_pattern(old_nodes, LINK_INLINE)
 
 def extract_markdown_images(text):
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return IMAGE_PATTERN.findall(text)
 
 def extract_markdown_links(text):
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
-
+    return LINK_PATTERN.findall(text)
@@ -0,0 +1,108 @@
+import functools
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+_active_timer = None
+
+class PhaseTimer:
+    def __init__(self):
+        self.totals = {}
+        self.stack = []
+
+    def start(self, name):
+        self.stack.append([name, time.perf_counter(), 0.0])
+
+    def stop(self):
+        # phases are exclusive: time spent in a nested phase is not counted twice
+        name, started, nested = self.stack.pop()
+        elapsed = time.perf_counter() - started
+        self.totals[name] = self.totals.get(name, 0.0) + elapsed - nested
+        if self.stack:
+            self.stack[-1][2] += elapsed
+        return elapsed
+
+    @contextmanager
+    def phase(self, name):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+def phase(timer, name):
+    if timer is None:
+        return nullcontext()
+    return timer.phase(name)
+
+@contextmanager
+def activate(timer):
+    global _active_timer
+    previous = _active_timer
+    _active_timer = timer
+    try:
+        yield timer
+    finally:
+        _active_timer = previous
+
+def timed(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timer = _active_timer
+            if timer is None:
+                return func(*args, **kwargs)
+            timer.start(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timer.stop()
+        return wrapper
+    return decorator
+
+class BuildReport:
+    def __init__(self):
+        self.timer = PhaseTimer()
+        self.pages = []
+
+    def phase(self, name):
+        return self.timer.phase(name)
+
+    def add_page(self, from_path, phases):
+        self.pages.append((from_path, phases))
+
+    def page_phase_totals(self):
+        totals = {}
+        for _, phases in self.pages:
+            for name, seconds in phases.items():
+                totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+    def slowest_pages(self, count=10):
+        return sorted(self.pages, key=lambda page: sum(page[1].values()), reverse=True)[:count]
+
+    def to_dict(self):
+        return {
+            "build": self.timer.totals,
+            "page_phases": self.page_phase_totals(),
+            "pages": [
+                {"path": from_path, "total": sum(phases.values()), "phases": phases}
+                for from_path, phases in self.pages
+            ],
+        }
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    def summary(self, slowest=10):
+        lines = ["Build phases:"]
+        for name, seconds in self.timer.totals.items():
+            lines.append(f"  {name:<16} {seconds * 1000:10.1f}ms")
+        lines.append(f"Page phases ({len(self.pages)} pages, summed across workers):")
+        for name, seconds in sorted(self.page_phase_totals().items(), key=lambda item: -item[1]):
+            lines.append(f"  {name:<16} {seconds * 1000:10.1f}ms")
+        lines.append("Slowest pages:")
+        for from_path, phases in self.slowest_pages(slowest):
+            lines.append(f"  {sum(phases.values()) * 1000:10.1f}ms  {from_path}")
+        return "\n".join(lines)
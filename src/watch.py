@@ -0,0 +1,176 @@
+import os
+import time
+
+from assets import publish_file
+from front_matter import read_front_matter
+from generate_content import PageBuildError, generate_page
+from listings import DEFAULT_PAGE_SIZE, generate_listings, listing_dest_path
+from manifest import remove_empty_dirs
+from site_index import SiteIndex, discover_pages
+from template import select_template
+
+def snapshot(*roots):
+    files = {}
+    for root in roots:
+        if root is None:
+            continue
+        if os.path.isfile(root):
+            stat = os.stat(root)
+            files[root] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        for dir_path, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dir_path, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+def diff_snapshots(old_files, new_files):
+    changed = sorted(path for path, stat in new_files.items() if old_files.get(path) != stat)
+    removed = sorted(path for path in old_files if path not in new_files)
+    return changed, removed
+
+def is_under(path, dir_path):
+    return path.startswith(os.path.join(dir_path, ""))
+
+class SiteWatcher:
+    def __init__(self, dir_path_content, dir_path_static, template_path, dest_dir_path, basepath, templates_dir=None, *, listings=(), page_size=DEFAULT_PAGE_SIZE):
+        self.dir_path_content = dir_path_content
+        self.dir_path_static = dir_path_static
+        self.template_path = template_path
+        self.templates_dir = templates_dir
+        self.dest_dir_path = dest_dir_path
+        self.basepath = basepath
+        self.listings = listings
+        self.page_size = page_size
+        self.pages = self.index_pages()
+        self.files = self.snapshot()
+
+    def index_pages(self):
+        pages = {}
+        for from_path, dest_path in discover_pages(self.dir_path_content, self.dest_dir_path):
+            entry = self.page_entry(from_path, dest_path)
+            if entry is not None:
+                pages[from_path] = entry
+        return pages
+
+    def page_entry(self, from_path, dest_path):
+        # only the front matter is read; drafts are left out like in build
+        try:
+            metadata = read_front_matter(from_path)
+        except (OSError, UnicodeDecodeError, ValueError):
+            metadata = {}
+        if metadata.get("draft") is True:
+            return None
+        page_template_path = select_template(
+            from_path, self.dir_path_content, self.template_path, self.templates_dir, metadata.get("template")
+        )
+        return (page_template_path, dest_path)
+
+    def snapshot(self):
+        return snapshot(self.dir_path_content, self.dir_path_static, self.template_path, self.templates_dir)
+
+    def poll(self):
+        files = self.snapshot()
+        changed, removed = diff_snapshots(self.files, files)
+        if not changed and not removed:
+            return []
+        start = time.perf_counter()
+        outputs = self.rebuild(changed, removed)
+        self.files = files
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"Rebuilt {len(outputs)} output(s) in {elapsed_ms:.1f}ms")
+        return outputs
+
+    def rebuild(self, changed, removed):
+        old_pages = self.pages
+        if self.needs_reindex(changed, removed):
+            self.pages = self.index_pages()
+        else:
+            # an edited page may have changed its template or draft flag
+            self.pages = dict(old_pages)
+            for path in changed:
+                if path in self.pages:
+                    entry = self.page_entry(path, self.pages[path][1])
+                    if entry is None:
+                        del self.pages[path]
+                    else:
+                        self.pages[path] = entry
+
+        changed_set = set(changed)
+        outputs = []
+        failures = []
+        for from_path, (page_template_path, dest_path) in self.pages.items():
+            if from_path in changed_set or page_template_path in changed_set or old_pages.get(from_path) != (page_template_path, dest_path):
+                try:
+                    generate_page(from_path, page_template_path, dest_path, self.basepath)
+                    outputs.append(dest_path)
+                except Exception as e:
+                    failures.append((from_path, e))
+
+        live_dests = {dest_path for _, dest_path in self.pages.values()}
+        for from_path, (_, dest_path) in old_pages.items():
+            if from_path not in self.pages and dest_path not in live_dests:
+                self.remove_output(dest_path)
+                outputs.append(dest_path)
+
+        for path in changed:
+            if is_under(path, self.dir_path_static):
+                dest_path = self.static_dest_path(path)
+                print(f" * {path} -> {dest_path}")
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                publish_file(path, dest_path)
+                outputs.append(dest_path)
+        for path in removed:
+            if is_under(path, self.dir_path_static):
+                dest_path = self.static_dest_path(path)
+                self.remove_output(dest_path)
+                outputs.append(dest_path)
+
+        if self.listings and any(not is_under(path, self.dir_path_static) for path in changed + removed):
+            outputs.extend(self.rebuild_listings())
+
+        if failures:
+            print(PageBuildError(failures))
+        return outputs
+
+    def rebuild_listings(self):
+        # any post can move between archive pages, so every listing is
+        # rendered again; only the ones whose bytes changed are written
+        index = SiteIndex.build(self.dir_path_content, self.dest_dir_path, self.template_path, self.templates_dir)
+        results = generate_listings(
+            index,
+            self.listings,
+            self.template_path,
+            self.dest_dir_path,
+            self.basepath,
+            page_size=self.page_size,
+            templates_dir=self.templates_dir,
+        )
+        return [listing_dest_path(self.dest_dir_path, url) for url, result in results if result["output"] == "written"]
+
+    def needs_reindex(self, changed, removed):
+        # the page set or template selection only moves when files appear or disappear
+        for path in changed:
+            if is_under(path, self.dir_path_content) and path not in self.pages:
+                return True
+            if self.templates_dir is not None and is_under(path, self.templates_dir) and path not in self.files:
+                return True
+        for path in removed:
+            if path in self.pages:
+                return True
+            if self.templates_dir is not None and is_under(path, self.templates_dir):
+                return True
+        return False
+
+    def static_dest_path(self, path):
+        return os.path.join(self.dest_dir_path, os.path.relpath(path, self.dir_path_static))
+
+    def remove_output(self, dest_path):
+        if os.path.isfile(dest_path):
+            print(f" * removing {dest_path}")
+            os.remove(dest_path)
+            remove_empty_dirs(os.path.dirname(dest_path))